@@ -20,7 +20,25 @@ if config.config_file_name is not None:
 # from myapp import mymodel
 # target_metadata = mymodel.Base.metadata
 from app.models import Base
-target_metadata = Base.metadata
+from app.online_migrations import progress_metadata
+target_metadata = [Base.metadata, progress_metadata]
+
+# Objects created by raw DDL rather than declared in the models; autogenerate
+# would otherwise propose dropping them
+UNMANAGED_TABLE_PREFIXES = ("blogs_fts",)  # FTS5 table and its shadow tables (SQLite)
+UNMANAGED_COLUMNS = {("blogs", "search_vector")}  # generated tsvector (PostgreSQL)
+UNMANAGED_INDEXES = {"ix_blogs_search_vector"}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Leave objects outside the models' metadata out of autogenerate."""
+    if type_ == "table":
+        return not name.startswith(UNMANAGED_TABLE_PREFIXES)
+    if type_ == "column":
+        return (object.table.name, name) not in UNMANAGED_COLUMNS
+    if type_ == "index":
+        return name not in UNMANAGED_INDEXES
+    return True
 
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
@@ -44,6 +62,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -67,7 +86,7 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata, include_object=include_object
         )
 
         with context.begin_transaction():
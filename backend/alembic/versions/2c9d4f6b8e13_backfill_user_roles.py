@@ -0,0 +1,35 @@
+"""Backfill user roles and make role non-nullable.
+
+Revision ID: 2c9d4f6b8e13
+Revises: f61a2c8e4b57
+Create Date: 2026-10-18 15:37:26.148530
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.online_migrations import backfill, batch_alter_table, progress_table, set_not_null
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2c9d4f6b8e13'
+down_revision: Union[str, None] = 'f61a2c8e4b57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Checkpoints for backfill(), in this and later revisions. backfill() commits
+    # it, so it is still there when a rerun resumes an interrupted backfill.
+    progress_table.create(op.get_bind(), checkfirst=True)
+    # Users created before roles existed have NULL roles; fill them in batches
+    backfill("users", {"role": "user"}, "role IS NULL", name="users_role_default")
+    set_not_null("users", "role", sa.String(), server_default="'user'")
+
+
+def downgrade() -> None:
+    with batch_alter_table("users") as batch:
+        batch.alter_column("role", existing_type=sa.String(), nullable=True, server_default=None)
+    progress_table.drop(op.get_bind(), checkfirst=True)
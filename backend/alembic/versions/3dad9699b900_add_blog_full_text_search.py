@@ -0,0 +1,70 @@
+"""Add blog full-text search.
+
+Revision ID: 3dad9699b900
+Revises: bc36827557fc
+Create Date: 2026-10-18 09:12:04.118532
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3dad9699b900'
+down_revision: Union[str, None] = 'bc36827557fc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        # Weighted tsvector maintained by PostgreSQL, with a GIN index for @@ lookups
+        op.execute("""
+            ALTER TABLE blogs ADD COLUMN search_vector tsvector
+            GENERATED ALWAYS AS (
+                setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+                setweight(to_tsvector('english', coalesce(content, '')), 'B')
+            ) STORED
+        """)
+        op.create_index('ix_blogs_search_vector', 'blogs', ['search_vector'], postgresql_using='gin')
+
+    elif dialect == 'sqlite':
+        # External-content FTS5 table kept in sync with triggers
+        op.execute("""
+            CREATE VIRTUAL TABLE blogs_fts
+            USING fts5(title, content, content='blogs', content_rowid='id')
+        """)
+        op.execute("""
+            CREATE TRIGGER blogs_fts_ai AFTER INSERT ON blogs BEGIN
+                INSERT INTO blogs_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER blogs_fts_ad AFTER DELETE ON blogs BEGIN
+                INSERT INTO blogs_fts(blogs_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER blogs_fts_au AFTER UPDATE ON blogs BEGIN
+                INSERT INTO blogs_fts(blogs_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+                INSERT INTO blogs_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+            END
+        """)
+        op.execute("INSERT INTO blogs_fts(blogs_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        op.drop_index('ix_blogs_search_vector', table_name='blogs')
+        op.drop_column('blogs', 'search_vector')
+
+    elif dialect == 'sqlite':
+        op.execute("DROP TRIGGER blogs_fts_au")
+        op.execute("DROP TRIGGER blogs_fts_ad")
+        op.execute("DROP TRIGGER blogs_fts_ai")
+        op.execute("DROP TABLE blogs_fts")
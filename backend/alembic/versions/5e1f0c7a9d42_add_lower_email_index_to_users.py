@@ -0,0 +1,27 @@
+"""Add case-insensitive email index to users.
+
+Revision ID: 5e1f0c7a9d42
+Revises: b9724824add8
+Create Date: 2026-10-18 12:05:13.284716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e1f0c7a9d42'
+down_revision: Union[str, None] = 'b9724824add8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Lookups compare lower(email), which the unique index on email can't serve
+    op.create_index('ix_users_email_lower', 'users', [sa.text('lower(email)')], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_email_lower', table_name='users')
@@ -0,0 +1,43 @@
+"""Make the case-insensitive email index unique.
+
+Revision ID: 7b1e4d9c2a60
+Revises: 2c9d4f6b8e13
+Create Date: 2026-10-18 18:12:40.517302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.online_migrations import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b1e4d9c2a60'
+down_revision: Union[str, None] = '2c9d4f6b8e13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Accounts differing only in email case predate case-insensitive lookups.
+    # Which one to keep is an operator's call, so refuse to run until they are merged.
+    duplicates = op.get_bind().execute(sa.text(
+        "SELECT lower(email) AS email, COUNT(*) AS accounts FROM users "
+        "GROUP BY lower(email) HAVING COUNT(*) > 1 ORDER BY lower(email)"
+    )).all()
+    if duplicates:
+        report = ", ".join(f"{row.email} ({row.accounts} accounts)" for row in duplicates)
+        raise RuntimeError(
+            f"Cannot make emails unique regardless of case; merge or remove these accounts first: {report}"
+        )
+
+    # Build the unique index next to the old one, so lookups stay indexed throughout
+    create_index_concurrently('uq_users_email_lower', 'users', [sa.text('lower(email)')], unique=True)
+    drop_index_concurrently('ix_users_email_lower', 'users')
+
+
+def downgrade() -> None:
+    create_index_concurrently('ix_users_email_lower', 'users', [sa.text('lower(email)')], unique=False)
+    drop_index_concurrently('uq_users_email_lower', 'users')
@@ -1,10 +1,16 @@
-from passlib.context import CryptContext
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import lru_cache
+import asyncio
+import hashlib
+import time
+import uuid
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
 import os
 from dotenv import load_dotenv
+from app.cache import LRUCache
+from app.metrics import PASSWORD_HASH_LATENCY
 
 # Load evironment variables
 load_dotenv()
@@ -13,67 +19,195 @@ load_dotenv()
 SECRET_KEY = os.getenv("SECRET_KEY", "thisismysecrectkey")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+REFRESH_TOKEN_EXPIRE_DAYS = 5
 
-# Password hashing setup
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Password hashing setup. Hashes below BCRYPT_ROUNDS are upgraded on next login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+
+# Password hashing worker pool. bcrypt releases the GIL, so threads hash in
+# parallel across cores without blocking the event loop.
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", os.cpu_count() or 1))
+# Hashing jobs allowed to wait or run at once before new ones are rejected
+HASH_MAX_PENDING = int(os.getenv("HASH_MAX_PENDING", HASH_WORKERS * 4))
+
+# Bulk hashing (e.g. user imports) never occupies more than half the pool,
+# across all imports at once, so interactive logins keep getting worker time
+BULK_HASH_CONCURRENCY = max(1, HASH_WORKERS // 2)
+BULK_HASH_CHUNK_SIZE = 16
+
+hash_executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="password-hash")
+_hash_pending = 0
+_bulk_hash_slots = asyncio.Semaphore(BULK_HASH_CONCURRENCY)
+
+# Verified access token claims, keyed by token digest and kept until the token expires
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 10000))
+token_cache = LRUCache(maxsize=TOKEN_CACHE_SIZE)
 
 # OAuth2PasswordBearer tells FastAPI we expect an "Authorization: Bearer <token> header"
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    """Build the passlib context on first use, keeping passlib out of startup."""
+    from passlib.context import CryptContext
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=BCRYPT_ROUNDS,
+        bcrypt__min_rounds=BCRYPT_ROUNDS,
+    )
+
+def warm_up_password_hashing():
+    """Load the bcrypt backend, which runs passlib's self-tests, ahead of the first login."""
+    get_pwd_context().handler("bcrypt").get_backend()
+
 def hash_password(password: str) -> str:
     """Hash a password securely."""
-    return pwd_context.hash(password)
+    start = time.perf_counter()
+    try:
+        return get_pwd_context().hash(password)
+    finally:
+        PASSWORD_HASH_LATENCY.observe(time.perf_counter() - start, operation="hash")
+
+def verify_and_update_password(plain_password: str, hashed_password: str):
+    """Verify a password and return a new hash if the stored one is outdated."""
+    start = time.perf_counter()
+    try:
+        return get_pwd_context().verify_and_update(plain_password, hashed_password)
+    except ValueError:
+        # Stored value is not a recognised hash (e.g. OAuth-only accounts)
+        return False, None
+    finally:
+        PASSWORD_HASH_LATENCY.observe(time.perf_counter() - start, operation="verify")
+
+async def run_in_hash_pool(func, *args):
+    """Run a hashing function on the worker pool, failing fast when it is saturated."""
+    global _hash_pending
+    if _hash_pending >= HASH_MAX_PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please try again shortly.",
+            headers={"Retry-After": "1"},
+        )
+
+    _hash_pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(hash_executor, func, *args)
+    finally:
+        _hash_pending -= 1
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password on the worker pool."""
+    return await run_in_hash_pool(hash_password, password)
+
+def hash_passwords(passwords: list) -> list:
+    """Hash a batch of passwords."""
+    return [hash_password(password) for password in passwords]
+
+async def hash_passwords_async(passwords: list) -> list:
+    """Hash many passwords in parallel on part of the worker pool, preserving order.
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify if a given password matches the stored hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    Chunks count towards HASH_MAX_PENDING like single hashes, so a saturated
+    pool rejects the batch with a 503 instead of queueing unbounded work.
+    """
 
-def create_tokens(data: dict, expires_delta: timedelta = None):
+    async def hash_chunk(chunk):
+        async with _bulk_hash_slots:
+            return await run_in_hash_pool(hash_passwords, chunk)
+
+    chunks = [
+        passwords[i:i + BULK_HASH_CHUNK_SIZE]
+        for i in range(0, len(passwords), BULK_HASH_CHUNK_SIZE)
+    ]
+    results = await asyncio.gather(*(hash_chunk(chunk) for chunk in chunks))
+    return [hashed for chunk in results for hashed in chunk]
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str):
+    """Verify a password on the worker pool, returning (valid, new_hash_or_None)."""
+    return await run_in_hash_pool(verify_and_update_password, plain_password, hashed_password)
+
+def create_tokens(data: dict, expires_delta: timedelta = None, jti: str = None):
     """Generate both access and refresh tokens."""
+    # python-jose loads its cryptography backends on import, so it is imported on first use
+    from jose import jwt
 
     # Short-lived access token
-    access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    access_token_expires = expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = jwt.encode(
         {**data, "exp": datetime.utcnow() + access_token_expires},
         SECRET_KEY,
         algorithm=ALGORITHM
     )
 
-    # Longer-lived refresh token
-    refresh_access_expires = timedelta(days=5)
+    # Longer-lived refresh token, identified by its jti so it can be rotated and revoked
+    refresh_access_expires = timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
     refresh_token = jwt.encode(
-        {**data, "exp": datetime.utcnow() + refresh_access_expires},
+        {
+            **data,
+            "exp": datetime.utcnow() + refresh_access_expires,
+            "jti": jti or uuid.uuid4().hex,
+            "type": "refresh",
+        },
         SECRET_KEY,
         algorithm=ALGORITHM
     )
 
     return {"access_token": access_token,  "refresh_token": refresh_token}
 
-def get_current_user(token: str = Depends(oauth2_scheme)):
-    """Extract and validate the user from JWT token."""
+def decode_token(token: str):
+    """Decode and verify a JWT, returning its claims or None if it is invalid."""
+    from jose import JWTError, jwt
     try:
-        # Decode JWT token
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email = payload.get("sub")
-        role = payload.get("role")
-
-        if email is None or role is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authentication token",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-        return {"email": email, "role": role}
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except JWTError:
+        return None
+
+def decode_access_token(token: str):
+    """Decode and verify a JWT, reusing cached claims for tokens seen before."""
+    key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        return payload
+
+    payload = decode_token(token)
+    if payload is None:
+        return None
+
+    # Cache only until the token's own expiry, so expired tokens are never served
+    exp = payload.get("exp")
+    if exp is not None:
+        ttl = exp - time.time()
+        if ttl > 0:
+            token_cache.set(key, payload, ttl=ttl)
+    return payload
+
+async def get_current_user(token: str = Depends(oauth2_scheme)):
+    """Extract and validate the user from JWT token."""
+    # Decode JWT token
+    payload = decode_access_token(token)
+    if payload is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    email = payload.get("sub")
+    role = payload.get("role")
+
+    # Refresh tokens are only accepted by /auth/refresh
+    if email is None or role is None or payload.get("type") == "refresh":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return {"email": email, "role": role}
+
 def require_role(required_role: str):  
     """Dependency to enforce role-based access control."""
-    def role_dependency(user: dict = Depends(get_current_user)):
+    async def role_dependency(user: dict = Depends(get_current_user)):
         
         # Ensure case-insensitive and space-free comparison
         if user.get('role').strip().lower() != required_role.strip().lower():
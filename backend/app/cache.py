@@ -0,0 +1,135 @@
+from collections import OrderedDict
+import hashlib
+import multiprocessing
+import threading
+import time
+
+
+class SharedGeneration:
+    """A counter in shared memory, seen by every process forked after it was created.
+
+    Under gunicorn with preload_app the app is imported before workers fork, so
+    a write on one worker can invalidate caches in all of them. Processes that
+    are spawned rather than forked each get their own counter.
+    """
+
+    def __init__(self):
+        self._value = multiprocessing.Value("Q", 0)
+
+    @property
+    def value(self) -> int:
+        return self._value.value
+
+    def bump(self) -> int:
+        with self._value.get_lock():
+            self._value.value += 1
+            return self._value.value
+
+
+class LRUCache:
+    """A size-bounded, thread-safe LRU cache whose entries can expire after a TTL.
+
+    With a SharedGeneration, clear() in any worker process clears the cache in
+    every worker sharing it, the next time they use it.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = None, shared_generation: SharedGeneration = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._generation = 0
+        self._shared = shared_generation
+        self._shared_seen = shared_generation.value if shared_generation is not None else 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _sync(self):
+        """Drop entries if another process cleared the cache (call with the lock held)."""
+        if self._shared is not None:
+            current = self._shared.value
+            if current != self._shared_seen:
+                self._data.clear()
+                self._generation += 1
+                self._shared_seen = current
+
+    @property
+    def generation(self) -> int:
+        """Bumped on clear() here or elsewhere, so callers can avoid storing values computed before it."""
+        with self._lock:
+            self._sync()
+            return self._generation
+
+    def get(self, key, default=None):
+        """Return the cached value for key, or default if missing or expired."""
+        with self._lock:
+            self._sync()
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return default
+
+            value, expires_at = item
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl: float = None):
+        """Store a value, evicting the least recently used entries when full."""
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = None if ttl is None else time.monotonic() + ttl
+
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        """Remove a key if present."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """Remove every entry, in every process sharing the generation."""
+        with self._lock:
+            self._data.clear()
+            self._generation += 1
+            if self._shared is not None:
+                self._shared_seen = self._shared.bump()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> dict:
+        """Return size and hit/miss counters for monitoring."""
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def make_etag(body: bytes) -> str:
+    """Return a strong ETag for a response body."""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Check an If-None-Match header against an ETag using weak comparison."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
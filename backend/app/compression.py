@@ -0,0 +1,215 @@
+import os
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Response compression settings
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+# Complete responses smaller than this are sent as-is; streamed responses are always compressed
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+# Media types (or type/ prefixes) eligible for compression
+COMPRESSION_CONTENT_TYPES = [
+    media_type.strip()
+    for media_type in os.getenv(
+        "COMPRESSION_CONTENT_TYPES", "application/json,application/x-ndjson,text/"
+    ).split(",")
+    if media_type.strip()
+]
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", 6))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", 4))
+ZSTD_LEVEL = int(os.getenv("ZSTD_LEVEL", 3))
+
+
+class GzipEncoder:
+    def __init__(self):
+        self.compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self.compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliEncoder:
+    def __init__(self):
+        self.compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.process(data)
+
+    def flush(self) -> bytes:
+        return self.compressor.flush()
+
+    def finish(self) -> bytes:
+        return self.compressor.finish()
+
+
+class ZstdEncoder:
+    def __init__(self):
+        self.compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.compress(data)
+
+    def flush(self) -> bytes:
+        return self.compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self.compressor.flush()
+
+
+# Supported encodings, most preferred first
+ENCODERS = {}
+if zstandard is not None:
+    ENCODERS["zstd"] = ZstdEncoder
+if brotli is not None:
+    ENCODERS["br"] = BrotliEncoder
+ENCODERS["gzip"] = GzipEncoder
+
+
+def choose_encoding(accept_encoding: str):
+    """Pick the preferred encoding the client accepts, or None."""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name:
+            accepted[name.strip().lower()] = quality
+
+    candidates = [
+        encoding for encoding in ENCODERS
+        if accepted.get(encoding, accepted.get("*", 0)) > 0
+    ]
+    if not candidates:
+        return None
+    # Highest client quality wins; ties go to the server's preference order
+    return max(candidates, key=lambda encoding: accepted.get(encoding, accepted.get("*", 0)))
+
+
+def is_compressible(content_type: str) -> bool:
+    media_type = content_type.split(";")[0].strip().lower()
+    return any(
+        media_type.startswith(allowed) if allowed.endswith("/") else media_type == allowed
+        for allowed in COMPRESSION_CONTENT_TYPES
+    )
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing responses with zstd, brotli or gzip.
+
+    Complete responses are compressed in one go when they reach
+    COMPRESSION_MIN_SIZE. Streaming responses (e.g. exports) are compressed
+    chunk by chunk and flushed after each one, so clients keep receiving data
+    as it is produced. Strong ETags are weakened on compressed responses, as
+    the bytes no longer match the identity representation.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not COMPRESSION_ENABLED or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for name, value in scope.get("headers", []):
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+        encoding = choose_encoding(accept_encoding)
+
+        start_message = None
+        encoder = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, encoder, passthrough
+
+            if message["type"] == "http.response.start":
+                headers = dict((name.lower(), value) for name, value in message.get("headers", []))
+                content_type = headers.get(b"content-type", b"").decode("latin-1")
+
+                if message["status"] == 304 and encoding is not None:
+                    # Keep validators consistent with the compressed 200 response
+                    await send({**message, "headers": self.weaken_etag(self.add_vary(message.get("headers", [])))})
+                    passthrough = True
+                elif b"content-encoding" in headers or not is_compressible(content_type):
+                    await send(message)
+                    passthrough = True
+                else:
+                    # Wait for the first body chunk to decide between whole and streamed compression
+                    start_message = message
+                return
+
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if encoder is None:
+                if encoding is None or (not more_body and len(body) < COMPRESSION_MIN_SIZE):
+                    await send({**start_message, "headers": self.add_vary(start_message["headers"])})
+                    await send(message)
+                    passthrough = True
+                    return
+
+                encoder = ENCODERS[encoding]()
+                headers = [
+                    (name, value) for name, value in self.weaken_etag(self.add_vary(start_message["headers"]))
+                    if name.lower() != b"content-length"
+                ]
+                headers.append((b"content-encoding", encoding.encode()))
+                if not more_body:
+                    body = encoder.compress(body) + encoder.finish()
+                    headers.append((b"content-length", str(len(body)).encode()))
+                    await send({**start_message, "headers": headers})
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                await send({**start_message, "headers": headers})
+
+            if more_body:
+                chunk = encoder.compress(body) + encoder.flush() if body else b""
+            else:
+                chunk = encoder.compress(body) + encoder.finish()
+            await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def add_vary(headers) -> list:
+        headers = list(headers)
+        for index, (name, value) in enumerate(headers):
+            if name.lower() == b"vary":
+                if b"accept-encoding" not in value.lower():
+                    headers[index] = (name, value + b", Accept-Encoding")
+                return headers
+        headers.append((b"vary", b"Accept-Encoding"))
+        return headers
+
+    @staticmethod
+    def weaken_etag(headers) -> list:
+        return [
+            (name, b"W/" + value if name.lower() == b"etag" and not value.startswith(b"W/") else value)
+            for name, value in headers
+        ]
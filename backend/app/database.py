@@ -1,7 +1,16 @@
 from sqlalchemy import create_engine, MetaData
+from sqlalchemy import exc as sa_exc
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
 import os
+import time
 from dotenv import load_dotenv
+from app.metrics import instrument_engine
+from app.profiling import observe_query
 
 
 # Load environment variables
@@ -9,7 +18,159 @@ load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-engine = create_engine(DATABASE_URL)
+# Async drivers used for each sync dialect in DATABASE_URL
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
+
+# Connection pool tuning
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# Server-side statement timeout in milliseconds (PostgreSQL only, 0 disables it)
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 0))
+
+def to_async_url(url: str) -> str:
+    """Convert a sync database URL to its async driver equivalent."""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend in ASYNC_DRIVERS:
+        url = url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+    return url.render_as_string(hide_password=False)
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or to_async_url(DATABASE_URL)
+
+
+class PoolStats:
+    """Counters describing how long requests wait for pooled connections."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_wait(self, seconds: float):
+        self.checkouts += 1
+        self.wait_total += seconds
+        self.wait_max = max(self.wait_max, seconds)
+
+    def as_dict(self) -> dict:
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_total_seconds": round(self.wait_total, 6),
+            "wait_avg_seconds": round(self.wait_total / self.checkouts, 6) if self.checkouts else 0.0,
+            "wait_max_seconds": round(self.wait_max, 6),
+        }
+
+
+def timed_pool_class(base, stats: PoolStats):
+    """Return a subclass of a queue pool that records checkout wait times into stats."""
+
+    class TimedPool(base):
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                return super()._do_get()
+            except sa_exc.TimeoutError:
+                stats.timeouts += 1
+                raise
+            finally:
+                stats.record_wait(time.perf_counter() - start)
+
+    return TimedPool
+
+
+def engine_options(url: str, stats: PoolStats = None, is_async: bool = False) -> dict:
+    """Build pool and connection options for an engine on the given URL."""
+    url = make_url(url)
+
+    # In-memory SQLite uses a single static connection, so there is no pool to tune
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+
+    options = {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+    if stats is not None:
+        base = AsyncAdaptedQueuePool if is_async else QueuePool
+        options["poolclass"] = timed_pool_class(base, stats)
+
+    if DB_STATEMENT_TIMEOUT_MS and url.get_backend_name() == "postgresql":
+        if url.get_driver_name() == "asyncpg":
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+
+# Sync engine, used by Alembic and scripts
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+
+# Async engine, used by the API routes
+pool_stats = PoolStats()
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, pool_stats, is_async=True)
+)
+instrument_engine(async_engine.sync_engine, observe_query)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
 Base = declarative_base()
 metadata = MetaData()
+
+
+# Database session dependency
+async def get_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def dialect_insert(db):
+    """Return the insert() construct for a session's dialect, with ON CONFLICT support where available."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert
+    if dialect == "sqlite":
+        return sqlite.insert
+    return insert
+
+
+def reset_pools_after_fork():
+    """Drop pooled connections inherited from a parent process without closing them.
+
+    Forked server workers call this so they open their own connections
+    instead of sharing the parent's sockets.
+    """
+    engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
+
+
+async def dispose_engines():
+    """Close every pooled connection, e.g. when the server shuts down."""
+    await async_engine.dispose()
+    engine.dispose()
+
+
+def get_pool_stats() -> dict:
+    """Return the API connection pool's current occupancy and checkout wait statistics."""
+    pool = async_engine.pool
+    stats = pool_stats.as_dict()
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+        )
+    return stats
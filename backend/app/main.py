@@ -1,13 +1,49 @@
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from starlette.middleware.sessions import SessionMiddleware
-from app.routes import blogs, users, auth, protected
+from app.routes import blogs, users, auth, protected, admin
+from app.auth import hash_executor, warm_up_password_hashing
+from app.compression import CompressionMiddleware
+from app.database import dispose_engines, get_pool_stats
+from app.metrics import registry, MetricsMiddleware, DB_POOL
+from app.profiling import ProfilingMiddleware
+from app.replicas import replica_router
+from app.serialization import ORJSONResponse
+from app.stats import run_stats_reconciler
+from app.tokens import run_token_sweeper
+from app.views import run_view_flusher
+import asyncio
 import os
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-app = FastAPI(title="Portfolio API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start background maintenance tasks, and stop them and close the pools on shutdown."""
+    # Load bcrypt off the event loop without holding up startup
+    hash_executor.submit(warm_up_password_hashing)
+
+    tasks = [
+        asyncio.create_task(run_token_sweeper()),
+        asyncio.create_task(run_view_flusher()),
+        asyncio.create_task(run_stats_reconciler()),
+    ]
+    if replica_router.replicas:
+        tasks.append(asyncio.create_task(replica_router.run_health_checks()))
+    yield
+    for task in tasks:
+        task.cancel()
+    for task in tasks:
+        with suppress(asyncio.CancelledError):
+            await task
+    # Runs after the server has drained in-flight requests
+    await replica_router.dispose()
+    await dispose_engines()
+
+app = FastAPI(title="Portfolio API", default_response_class=ORJSONResponse, lifespan=lifespan)
 
 # Ensure secret key is set correctly
 SECRET_KEY = os.getenv("SESSION_SECRET_KEY", "thisismysecrectkey")
@@ -15,12 +51,31 @@ SECRET_KEY = os.getenv("SESSION_SECRET_KEY", "thisismysecrectkey")
 # Add session middleware for OAuth authentication
 app.add_middleware(SessionMiddleware, secret_key=SECRET_KEY, session_cookie="oauth_session")
 
+# Flag slow and repeated queries, and profile requests when enabled
+app.add_middleware(ProfilingMiddleware)
+
+# Compress JSON, NDJSON and text responses for clients that accept it
+app.add_middleware(CompressionMiddleware)
+
+# Record per-route request metrics (outermost, so it times the whole stack)
+app.add_middleware(MetricsMiddleware)
+
 # Include API routes
 app.include_router(blogs.router)
 app.include_router(users.router)
 app.include_router(auth.router)
 app.include_router(protected.router)
+app.include_router(admin.router)
 
 @app.get("/")
 def root():
     return {"Message": "Welcome to My Portfolio API"}
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Expose application metrics in the Prometheus text format."""
+    pool = get_pool_stats()
+    for state in ("checked_in", "checked_out", "overflow"):
+        if state in pool:
+            DB_POOL.set(pool[state], state=state)
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
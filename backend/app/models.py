@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey
+from sqlalchemy import DDL, BigInteger, Column, Integer, String, Text, ForeignKey, DateTime, Index, event, func
 from app.database import Base
 
 class Blog(Base):
@@ -7,7 +7,70 @@ class Blog(Base):
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
     content = Column(Text, nullable=False)
-    author = Column(String, nullable=False)
+    author = Column(String, nullable=False, index=True)
+
+
+# PostgreSQL: a stored, weighted tsvector column kept up to date by the database
+SEARCH_POSTGRES_DDL = [
+    """
+    ALTER TABLE blogs ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(content, '')), 'B')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_blogs_search_vector ON blogs USING GIN (search_vector)",
+]
+
+# SQLite: an external-content FTS5 table kept in sync with triggers
+SEARCH_SQLITE_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS blogs_fts
+    USING fts5(title, content, content='blogs', content_rowid='id')
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS blogs_fts_ai AFTER INSERT ON blogs BEGIN
+        INSERT INTO blogs_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS blogs_fts_ad AFTER DELETE ON blogs BEGIN
+        INSERT INTO blogs_fts(blogs_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS blogs_fts_au AFTER UPDATE ON blogs BEGIN
+        INSERT INTO blogs_fts(blogs_fts, rowid, title, content) VALUES ('delete', old.id, old.title, old.content);
+        INSERT INTO blogs_fts(rowid, title, content) VALUES (new.id, new.title, new.content);
+    END
+    """,
+]
+
+# Create the search index alongside the blogs table when using metadata.create_all();
+# app.search queries it, and alembic/versions/3dad9699b900 creates it for migrated databases
+for statement in SEARCH_POSTGRES_DDL:
+    event.listen(Blog.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+for statement in SEARCH_SQLITE_DDL:
+    event.listen(Blog.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+
+
+class BlogView(Base):
+    __tablename__ = "blog_views"
+
+    blog_id = Column(Integer, ForeignKey("blogs.id", ondelete="CASCADE"), primary_key=True)
+    views = Column(BigInteger, nullable=False, default=0, index=True)
+
+
+class BlogRender(Base):
+    __tablename__ = "blog_renders"
+
+    blog_id = Column(Integer, ForeignKey("blogs.id", ondelete="CASCADE"), primary_key=True)
+    content_hash = Column(String, nullable=False)
+    html = Column(Text, nullable=False)
+    excerpt = Column(Text, nullable=False)
+    word_count = Column(Integer, nullable=False)
+    reading_time_minutes = Column(Integer, nullable=False)
+    rendered_at = Column(DateTime, nullable=False)
 
 
 class User(Base):
@@ -16,4 +79,17 @@ class User(Base):
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String, unique=True, nullable=False)
     password = Column(String, nullable=False)
-    role = Column(String, default="user")
\ No newline at end of file
+    role = Column(String, default="user", server_default="user", nullable=False)
+
+    # Case-insensitive lookups by email; also keeps emails unique regardless of case
+    __table_args__ = (Index("uq_users_email_lower", func.lower(email), unique=True),)
+
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True)
+    jti = Column(String, unique=True, index=True, nullable=False)
+    user_email = Column(String, nullable=False, index=True)
+    expires_at = Column(DateTime, nullable=False, index=True)
+    revoked_at = Column(DateTime, nullable=True)
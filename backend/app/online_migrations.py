@@ -0,0 +1,287 @@
+"""Helpers for running Alembic migrations without long table locks.
+
+Use them from a revision's upgrade()/downgrade(), e.g.::
+
+    from app.online_migrations import backfill, create_index_concurrently
+
+    def upgrade():
+        backfill("users", {"role": "user"}, "role IS NULL", name="users_role_default")
+        create_index_concurrently("ix_users_role", "users", ["role"])
+
+Backfills and concurrent index builds run in autocommit blocks, so work
+committed before them in the same revision is committed first. Timeouts and
+concurrent builds only apply to PostgreSQL; other databases run the same
+statements plainly.
+"""
+from contextlib import contextmanager
+from datetime import datetime
+from alembic import op
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, exc as sa_exc, text
+import logging
+import os
+import time
+
+logger = logging.getLogger("alembic.online_migrations")
+
+# Defaults, overridable per call or through the environment
+MIGRATION_BATCH_SIZE = int(os.getenv("MIGRATION_BATCH_SIZE", 5000))
+# Pause between batches, leaving room for application queries and replication
+MIGRATION_BATCH_PAUSE = float(os.getenv("MIGRATION_BATCH_PAUSE", 0.05))
+# Give up waiting for a lock after this long instead of queueing traffic behind us
+MIGRATION_LOCK_TIMEOUT_MS = int(os.getenv("MIGRATION_LOCK_TIMEOUT_MS", 2000))
+MIGRATION_STATEMENT_TIMEOUT_MS = int(os.getenv("MIGRATION_STATEMENT_TIMEOUT_MS", 60000))
+# Attempts per batch when it hits the lock or statement timeout
+MIGRATION_MAX_RETRIES = int(os.getenv("MIGRATION_MAX_RETRIES", 5))
+
+# Checkpoints of unfinished backfills, removed once a backfill completes.
+# Created by revision 2c9d4f6b8e13, so backfill() can only run in revisions after it.
+progress_metadata = MetaData()
+progress_table = Table(
+    "online_migration_progress",
+    progress_metadata,
+    Column("name", String, primary_key=True),
+    Column("last_key", Integer, nullable=False),
+    Column("rows_updated", Integer, nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+)
+
+
+def is_postgresql(conn) -> bool:
+    return conn.dialect.name == "postgresql"
+
+
+@contextmanager
+def timeouts(conn, lock_timeout_ms: int = None, statement_timeout_ms: int = None):
+    """Apply lock/statement timeouts to the connection for the duration of the block (PostgreSQL)."""
+    if not is_postgresql(conn):
+        yield
+        return
+
+    lock_timeout_ms = MIGRATION_LOCK_TIMEOUT_MS if lock_timeout_ms is None else lock_timeout_ms
+    statement_timeout_ms = MIGRATION_STATEMENT_TIMEOUT_MS if statement_timeout_ms is None else statement_timeout_ms
+    conn.execute(text(f"SET lock_timeout = {int(lock_timeout_ms)}"))
+    conn.execute(text(f"SET statement_timeout = {int(statement_timeout_ms)}"))
+    try:
+        yield
+    finally:
+        conn.execute(text("RESET lock_timeout"))
+        conn.execute(text("RESET statement_timeout"))
+
+
+def is_timeout(error: sa_exc.DBAPIError) -> bool:
+    """Whether a database error is a lock or statement timeout worth retrying."""
+    # 55P03 lock_not_available, 57014 query_canceled (statement_timeout)
+    code = getattr(error.orig, "pgcode", None) or getattr(error.orig, "sqlstate", None)
+    return code in ("55P03", "57014") or "database is locked" in str(error.orig)
+
+
+def run_with_retries(conn, statement, params: dict, description: str, max_retries: int = None):
+    """Execute a statement, backing off and retrying when it times out on locks."""
+    max_retries = MIGRATION_MAX_RETRIES if max_retries is None else max_retries
+    for attempt in range(1, max_retries + 1):
+        try:
+            return conn.execute(statement, params)
+        except sa_exc.DBAPIError as error:
+            if attempt == max_retries or not is_timeout(error):
+                raise
+            delay = min(30, 0.5 * 2 ** attempt)
+            logger.warning("%s timed out (attempt %d/%d), retrying in %.1fs", description, attempt, max_retries, delay)
+            time.sleep(delay)
+
+
+def load_checkpoint(conn, name: str):
+    return conn.execute(
+        progress_table.select().where(progress_table.c.name == name)
+    ).first()
+
+
+def save_checkpoint(conn, name: str, last_key: int, rows_updated: int):
+    values = {"last_key": last_key, "rows_updated": rows_updated, "updated_at": datetime.utcnow()}
+    updated = conn.execute(
+        progress_table.update().where(progress_table.c.name == name).values(**values)
+    )
+    if updated.rowcount == 0:
+        conn.execute(progress_table.insert().values(name=name, **values))
+
+
+def clear_checkpoint(conn, name: str):
+    conn.execute(progress_table.delete().where(progress_table.c.name == name))
+
+
+def backfill(
+    table: str,
+    values: dict,
+    condition: str = None,
+    name: str = None,
+    key: str = "id",
+    batch_size: int = None,
+    pause: float = None,
+    lock_timeout_ms: int = None,
+    statement_timeout_ms: int = None,
+):
+    """UPDATE table SET values [WHERE condition] in committed primary-key range batches.
+
+    Each batch covers key range [start, start + batch_size) and commits on its
+    own, so row locks are held briefly and replicas keep up. Progress is logged
+    per batch and checkpointed under name, so a rerun after a failure resumes
+    after the last finished batch; the checkpoint is removed on completion.
+    condition should make the update idempotent (e.g. "role IS NULL"), which
+    also keeps rows written meanwhile correct. Returns the number of rows updated.
+    """
+    name = name or f"backfill_{table}_{'_'.join(values)}"
+    batch_size = batch_size or MIGRATION_BATCH_SIZE
+    pause = MIGRATION_BATCH_PAUSE if pause is None else pause
+
+    assignments = ", ".join(f"{column} = :value_{column}" for column in values)
+    where = f"{key} >= :start AND {key} < :stop"
+    if condition:
+        where += f" AND ({condition})"
+    statement = text(f"UPDATE {table} SET {assignments} WHERE {where}")
+    params = {f"value_{column}": value for column, value in values.items()}
+
+    with op.get_context().autocommit_block():
+        conn = op.get_bind()
+        checkpoint = load_checkpoint(conn, name)
+        bounds = conn.execute(text(f"SELECT MIN({key}), MAX({key}) FROM {table}")).first()
+        if bounds[0] is None:
+            clear_checkpoint(conn, name)
+            return 0
+
+        low, high = bounds
+        start = low
+        total = 0
+        if checkpoint is not None:
+            start = max(low, checkpoint.last_key + 1)
+            total = checkpoint.rows_updated
+            logger.info("Resuming backfill %s after %s=%d (%d rows already updated)", name, key, checkpoint.last_key, total)
+
+        began = time.monotonic()
+        first = start
+        with timeouts(conn, lock_timeout_ms, statement_timeout_ms):
+            while start <= high:
+                stop = start + batch_size
+                result = run_with_retries(
+                    conn, statement, {**params, "start": start, "stop": stop},
+                    f"Backfill {name} batch {key} {start}-{stop - 1}",
+                )
+                total += max(result.rowcount, 0)
+                save_checkpoint(conn, name, stop - 1, total)
+
+                position = min(stop - 1, high)
+                elapsed = time.monotonic() - began
+                eta = elapsed / (position - first + 1) * (high - position)
+                logger.info(
+                    "Backfill %s: %s up to %d of %d (%.1f%%), %d rows updated, ETA %.0fs",
+                    name, key, position, high, 100.0 * (position - low + 1) / (high - low + 1), total, eta,
+                )
+
+                start = stop
+                if pause and start <= high:
+                    time.sleep(pause)
+
+        clear_checkpoint(conn, name)
+        logger.info("Backfill %s finished: %d rows updated", name, total)
+        return total
+
+
+def create_index_concurrently(index_name: str, table: str, columns: list, lock_timeout_ms: int = None, **kw):
+    """Create an index without blocking writes (CREATE INDEX CONCURRENTLY on PostgreSQL).
+
+    A failed concurrent build leaves an invalid index behind, which is dropped
+    before the error is re-raised so the migration can simply be retried.
+    """
+    with op.get_context().autocommit_block():
+        conn = op.get_bind()
+        if not is_postgresql(conn):
+            op.create_index(index_name, table, columns, **kw)
+            return
+
+        # Building can take long; only acquiring the lock is bounded
+        with timeouts(conn, lock_timeout_ms, statement_timeout_ms=0):
+            try:
+                op.create_index(index_name, table, columns, postgresql_concurrently=True, if_not_exists=True, **kw)
+            except Exception:
+                conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}"))
+                raise
+
+
+def drop_index_concurrently(index_name: str, table: str, lock_timeout_ms: int = None):
+    """Drop an index without blocking reads and writes (PostgreSQL)."""
+    with op.get_context().autocommit_block():
+        conn = op.get_bind()
+        if not is_postgresql(conn):
+            op.drop_index(index_name, table_name=table)
+            return
+        with timeouts(conn, lock_timeout_ms, statement_timeout_ms=0):
+            op.drop_index(index_name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+@contextmanager
+def batch_alter_table(table: str):
+    """op.batch_alter_table() that keeps expression indexes when SQLite rebuilds the table.
+
+    Batch mode recreates the table from reflection, which drops indexes on
+    expressions such as lower(email); they are re-created from their DDL.
+    """
+    conn = op.get_bind()
+    indexes = []
+    if conn.dialect.name == "sqlite":
+        indexes = conn.execute(
+            text("SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = :table AND sql IS NOT NULL"),
+            {"table": table},
+        ).all()
+
+    with op.batch_alter_table(table) as batch:
+        yield batch
+
+    for name, sql in indexes:
+        exists = conn.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = :name"), {"name": name}
+        ).first()
+        if exists is None:
+            conn.execute(text(sql))
+
+
+def set_not_null(table: str, column: str, existing_type, server_default: str = None, lock_timeout_ms: int = None):
+    """Make a column NOT NULL (and optionally set its SQL default, e.g. "'user'") without a long exclusive lock.
+
+    On PostgreSQL, SET NOT NULL normally scans the whole table under an
+    ACCESS EXCLUSIVE lock. Adding a NOT VALID check constraint and validating
+    it separately only takes locks that allow reads and writes, and
+    PostgreSQL 12+ then uses the validated constraint to skip the scan. Each
+    step is safe to repeat, so a revision that failed part-way can be rerun.
+    """
+    conn = op.get_bind()
+    if not is_postgresql(conn):
+        with batch_alter_table(table) as batch:
+            batch.alter_column(
+                column,
+                existing_type=existing_type,
+                nullable=False,
+                server_default=text(server_default) if server_default is not None else None,
+            )
+        return
+
+    constraint = f"ck_{table}_{column}_not_null"
+    with op.get_context().autocommit_block(), timeouts(conn, lock_timeout_ms, statement_timeout_ms=0):
+        if server_default is not None:
+            run_with_retries(
+                conn, text(f"ALTER TABLE {table} ALTER COLUMN {column} SET DEFAULT {server_default}"), {},
+                f"Set default on {table}.{column}",
+            )
+        # Left behind if an earlier attempt failed after adding it
+        run_with_retries(
+            conn, text(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {constraint}"), {}, f"Drop stale {constraint}"
+        )
+        run_with_retries(
+            conn, text(f"ALTER TABLE {table} ADD CONSTRAINT {constraint} CHECK ({column} IS NOT NULL) NOT VALID"), {},
+            f"Add {constraint}",
+        )
+        run_with_retries(conn, text(f"ALTER TABLE {table} VALIDATE CONSTRAINT {constraint}"), {}, f"Validate {constraint}")
+        run_with_retries(
+            conn, text(f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL"), {},
+            f"Set NOT NULL on {table}.{column}",
+        )
+        run_with_retries(
+            conn, text(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {constraint}"), {}, f"Drop {constraint}"
+        )
@@ -0,0 +1,135 @@
+from contextvars import ContextVar
+from functools import lru_cache
+import cProfile
+import logging
+import os
+import tempfile
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Profile every request, or only those sending "X-Profile: 1" when the header is allowed
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILING_ALLOW_HEADER = os.getenv("PROFILING_ALLOW_HEADER", "false").lower() == "true"
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "portfolio-profiles"))
+# Sampling interval for pyinstrument, in seconds
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL", 0.001))
+
+# Statements slower than this are logged
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 100))
+# The same statement this many times in one request is reported as a likely N+1
+REPEATED_QUERY_THRESHOLD = int(os.getenv("REPEATED_QUERY_THRESHOLD", 5))
+
+# Statement counts for the request being served, if any
+request_queries = ContextVar("request_queries", default=None)
+
+# Only one profiler can be attached to the event loop thread at a time
+_profiling_active = False
+
+
+def observe_query(statement: str, parameters, elapsed: float):
+    """Log a slow statement and count it for the request; an instrument_engine observer."""
+    elapsed_ms = elapsed * 1000
+    if elapsed_ms >= SLOW_QUERY_MS:
+        logger.warning("Slow query (%.1f ms): %s | params=%.200r", elapsed_ms, statement, parameters)
+
+    counts = request_queries.get()
+    if counts is not None:
+        counts[statement] = counts.get(statement, 0) + 1
+
+
+@lru_cache(maxsize=None)
+def load_sampling_profiler():
+    """Import pyinstrument on the first profiled request; None, with a warning, if it is missing."""
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        logger.warning(
+            "pyinstrument is not installed, profiling with cProfile instead; "
+            "it adds far more overhead and records every request running on the loop"
+        )
+        return None
+    return Profiler
+
+
+def report_repeated_queries(counts: dict, method: str, path: str):
+    for statement, count in counts.items():
+        if count >= REPEATED_QUERY_THRESHOLD:
+            logger.warning(
+                "Possible N+1: statement ran %d times in %s %s: %s", count, method, path, statement
+            )
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that flags repeated queries per request and optionally profiles it.
+
+    Profiles use pyinstrument (a sampling profiler, in requirements.txt) and write
+    an HTML flamegraph; without it cProfile writes a .pstats file. The artifact name
+    is returned in the X-Profile-Artifact response header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def should_profile(self, scope) -> bool:
+        if PROFILING_ENABLED:
+            return True
+        if PROFILING_ALLOW_HEADER:
+            return (b"x-profile", b"1") in scope.get("headers", [])
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        counts = {}
+        token = request_queries.set(counts)
+        try:
+            if self.should_profile(scope) and not _profiling_active:
+                await self.profile(scope, receive, send)
+            else:
+                await self.app(scope, receive, send)
+        finally:
+            request_queries.reset(token)
+            report_repeated_queries(counts, scope["method"], scope["path"])
+
+    async def profile(self, scope, receive, send):
+        global _profiling_active
+
+        SamplingProfiler = load_sampling_profiler()
+        extension = "html" if SamplingProfiler is not None else "pstats"
+        slug = scope["path"].strip("/").replace("/", "_") or "root"
+        artifact = f"{time.strftime('%Y%m%dT%H%M%S')}-{scope['method']}-{slug}-{uuid.uuid4().hex[:8]}.{extension}"
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-artifact", artifact.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        _profiling_active = True
+        if SamplingProfiler is not None:
+            profiler = SamplingProfiler(interval=PROFILE_INTERVAL, async_mode="enabled")
+            profiler.start()
+        else:
+            # Deterministic fallback; also records other requests running on the loop
+            profiler = cProfile.Profile()
+            profiler.enable()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            path = os.path.join(PROFILE_DIR, artifact)
+            if SamplingProfiler is not None:
+                profiler.stop()
+                with open(path, "w") as f:
+                    f.write(profiler.output_html())
+            else:
+                profiler.disable()
+                profiler.dump_stats(path)
+            _profiling_active = False
+            logger.info("Wrote profile for %s %s to %s", scope["method"], scope["path"], path)
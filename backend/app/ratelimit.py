@@ -0,0 +1,137 @@
+from abc import ABC, abstractmethod
+from fastapi import HTTPException, Request, status
+import math
+import os
+import time
+
+# Rate limiting for credential endpoints, applied before any hashing or DB work
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_IP_PER_MINUTE = float(os.getenv("RATE_LIMIT_IP_PER_MINUTE", 30))
+RATE_LIMIT_IP_BURST = int(os.getenv("RATE_LIMIT_IP_BURST", 10))
+RATE_LIMIT_EMAIL_PER_MINUTE = float(os.getenv("RATE_LIMIT_EMAIL_PER_MINUTE", 5))
+RATE_LIMIT_EMAIL_BURST = int(os.getenv("RATE_LIMIT_EMAIL_BURST", 5))
+
+
+class RateLimitBackend(ABC):
+    """Storage interface for token-bucket rate limiting.
+
+    Implement hit() to share limits across workers, e.g. with Redis, and
+    install the backend with set_rate_limit_backend().
+    """
+
+    @abstractmethod
+    async def hit(self, key: str, rate: float, burst: int, cost: float = 1.0) -> float:
+        """Take cost tokens from key's bucket; return 0 if allowed, else seconds until allowed."""
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Per-process token buckets, expired by a hashed time wheel.
+
+    A bucket is dropped once it would have refilled to its burst size, since
+    it is then indistinguishable from a new one. Each bucket sits in the
+    wheel slot for its expiry tick, so expiring buckets costs O(1) per tick
+    instead of scanning every key.
+    """
+
+    def __init__(self, slots: int = 512, resolution: float = 1.0):
+        self.resolution = resolution
+        self.slots = [set() for _ in range(slots)]
+        self.buckets = {}  # key -> [tokens, updated_at, expires_at, slot]
+        self.tick = int(time.monotonic() / resolution)
+
+    def expire(self, now: float):
+        """Advance the wheel to now, dropping buckets that have fully refilled."""
+        previous, self.tick = self.tick, int(now / self.resolution)
+        steps = min(self.tick - previous, len(self.slots))
+        for step in range(1, steps + 1):
+            slot = self.slots[(previous + step) % len(self.slots)]
+            for key in list(slot):
+                bucket = self.buckets[key]
+                if bucket[2] <= now:
+                    del self.buckets[key]
+                    slot.discard(key)
+                else:
+                    # Expiry is further out than one turn of the wheel
+                    self.schedule(key, bucket)
+
+    def schedule(self, key: str, bucket: list):
+        """Move a bucket to the wheel slot for its expiry, capped at one turn ahead."""
+        ticks_ahead = int(bucket[2] / self.resolution) - self.tick
+        ticks_ahead = max(1, min(ticks_ahead, len(self.slots) - 1))
+        slot = (self.tick + ticks_ahead) % len(self.slots)
+        if bucket[3] != slot:
+            if bucket[3] is not None:
+                self.slots[bucket[3]].discard(key)
+            self.slots[slot].add(key)
+            bucket[3] = slot
+
+    async def hit(self, key: str, rate: float, burst: int, cost: float = 1.0) -> float:
+        now = time.monotonic()
+        self.expire(now)
+
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = [float(burst), now, now, None]
+
+        tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+        allowed = tokens >= cost
+        if allowed:
+            tokens -= cost
+
+        bucket[0] = tokens
+        bucket[1] = now
+        bucket[2] = now + (burst - tokens) / rate
+        self.schedule(key, bucket)
+
+        return 0.0 if allowed else (cost - tokens) / rate
+
+    def __len__(self):
+        return len(self.buckets)
+
+
+rate_limit_backend = InMemoryRateLimitBackend()
+
+
+def set_rate_limit_backend(backend: RateLimitBackend):
+    """Replace the rate limit storage backend."""
+    global rate_limit_backend
+    rate_limit_backend = backend
+
+
+async def request_email(request: Request):
+    """Return the normalised email from a JSON request body, if present."""
+    try:
+        body = await request.json()
+    except ValueError:
+        return None
+    email = body.get("email") if isinstance(body, dict) else None
+    return email.strip().lower() if isinstance(email, str) else None
+
+
+def rate_limit(scope: str, by_email: bool = False):
+    """Dependency limiting requests per client IP and, optionally, per email in the body."""
+
+    async def rate_limit_dependency(request: Request):
+        if not RATE_LIMIT_ENABLED:
+            return
+
+        client = request.client.host if request.client else "unknown"
+        retry_after = await rate_limit_backend.hit(
+            f"{scope}:ip:{client}", RATE_LIMIT_IP_PER_MINUTE / 60, RATE_LIMIT_IP_BURST
+        )
+
+        if not retry_after and by_email:
+            email = await request_email(request)
+            if email:
+                retry_after = await rate_limit_backend.hit(
+                    f"{scope}:email:{email}", RATE_LIMIT_EMAIL_PER_MINUTE / 60, RATE_LIMIT_EMAIL_BURST
+                )
+
+        if retry_after:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests, please try again later.",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
+
+    return rate_limit_dependency
@@ -0,0 +1,152 @@
+from datetime import datetime
+from functools import lru_cache
+from sqlalchemy import select
+from app.cache import LRUCache
+from app.database import AsyncSessionLocal, dialect_insert
+from app.models import BlogRender
+import asyncio
+import hashlib
+import html
+import logging
+import math
+import os
+import re
+
+logger = logging.getLogger(__name__)
+
+# Bump when rendering output changes, so stored renders are regenerated
+RENDERER_VERSION = "1"
+
+# Rendered bodies by content hash, in front of the blog_renders table
+RENDER_CACHE_SIZE = int(os.getenv("RENDER_CACHE_SIZE", 1000))
+render_cache = LRUCache(maxsize=RENDER_CACHE_SIZE)
+
+RENDER_EXCERPT_LENGTH = 200
+WORDS_PER_MINUTE = 200
+MARKDOWN_EXTENSIONS = ["fenced_code", "tables", "sane_lists"]
+
+# Attributes allowed through the sanitizer on top of nh3's defaults
+ALLOWED_ATTRIBUTES = {"code": {"class"}, "th": {"align"}, "td": {"align"}}
+
+
+def content_hash(content: str) -> str:
+    return hashlib.blake2b(f"{RENDERER_VERSION}\0{content}".encode(), digest_size=16).hexdigest()
+
+
+def to_plain_text(body: str) -> str:
+    """Strip tags and collapse whitespace in rendered HTML."""
+    return " ".join(html.unescape(re.sub(r"<[^>]+>", " ", body)).split())
+
+
+def make_excerpt(text: str) -> str:
+    """Cut text to RENDER_EXCERPT_LENGTH characters at a word boundary."""
+    if len(text) <= RENDER_EXCERPT_LENGTH:
+        return text
+    return text[:RENDER_EXCERPT_LENGTH].rsplit(" ", 1)[0] + "…"
+
+
+@lru_cache(maxsize=None)
+def load_renderer():
+    """Import markdown and nh3 on first render, keeping them out of startup; None if not installed."""
+    try:
+        import markdown
+        import nh3
+    except ImportError:
+        return None
+    return markdown, nh3
+
+
+def render_markdown(content: str) -> dict:
+    """Render markdown to sanitized HTML, with a plain-text excerpt and reading time.
+
+    Without the markdown and nh3 packages the content is escaped and split into
+    paragraphs instead, so unsanitized HTML is never produced.
+    """
+    renderer = load_renderer()
+    if renderer is not None:
+        markdown, nh3 = renderer
+        body = nh3.clean(
+            markdown.markdown(content, extensions=MARKDOWN_EXTENSIONS),
+            attributes={**nh3.ALLOWED_ATTRIBUTES, **ALLOWED_ATTRIBUTES},
+        )
+    else:
+        paragraphs = [part.strip() for part in re.split(r"\n\s*\n", content) if part.strip()]
+        body = "".join(f"<p>{html.escape(part)}</p>" for part in paragraphs)
+
+    text = to_plain_text(body)
+    words = len(text.split())
+    return {
+        "html": body,
+        "excerpt": make_excerpt(text),
+        "word_count": words,
+        "reading_time_minutes": max(1, math.ceil(words / WORDS_PER_MINUTE)),
+    }
+
+
+def render_many(contents: list) -> list:
+    return [render_markdown(content) for content in contents]
+
+
+async def get_renders(db, blogs: list) -> dict:
+    """Return {blog_id: render} for (id, content) pairs, rendering only new content versions.
+
+    Lookups go to the in-process LRU first, then the blog_renders table; only
+    blogs whose stored hash is missing or stale are rendered, off the event
+    loop, and written back in one upsert on the primary.
+    """
+    hashes = {blog_id: content_hash(content) for blog_id, content in blogs}
+    renders = {}
+    for blog_id, digest in hashes.items():
+        cached = render_cache.get(digest)
+        if cached is not None:
+            renders[blog_id] = cached
+
+    missing = [blog_id for blog_id in hashes if blog_id not in renders]
+    if missing:
+        result = await db.execute(
+            select(
+                BlogRender.blog_id, BlogRender.content_hash, BlogRender.html,
+                BlogRender.excerpt, BlogRender.word_count, BlogRender.reading_time_minutes,
+            ).where(BlogRender.blog_id.in_(missing))
+        )
+        for row in result:
+            if row.content_hash == hashes[row.blog_id]:
+                render = {
+                    "html": row.html,
+                    "excerpt": row.excerpt,
+                    "word_count": row.word_count,
+                    "reading_time_minutes": row.reading_time_minutes,
+                }
+                render_cache.set(row.content_hash, render)
+                renders[row.blog_id] = render
+
+    stale = [(blog_id, content) for blog_id, content in blogs if blog_id not in renders]
+    if stale:
+        rendered = await asyncio.to_thread(render_many, [content for _, content in stale])
+        now = datetime.utcnow()
+        rows = []
+        for (blog_id, _), render in zip(stale, rendered):
+            render_cache.set(hashes[blog_id], render)
+            renders[blog_id] = render
+            rows.append({"blog_id": blog_id, "content_hash": hashes[blog_id], "rendered_at": now, **render})
+        try:
+            await store_renders(rows)
+        except Exception:
+            # The renders are still served; they are stored again on a later read
+            logger.exception("Storing %d blog renders failed", len(rows))
+
+    return renders
+
+
+async def store_renders(rows: list):
+    """Upsert rendered bodies; runs on the primary since reads may come from a replica."""
+    async with AsyncSessionLocal() as db:
+        insert = dialect_insert(db)
+        table = BlogRender.__table__
+        statement = insert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.blog_id],
+            set_={column: statement.excluded[column] for column in rows[0] if column != "blog_id"},
+        )
+        await db.execute(statement, rows)
+        await db.commit()
@@ -0,0 +1,147 @@
+from fastapi import Request, Response
+from itsdangerous import BadSignature, TimestampSigner
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from app.auth import SECRET_KEY
+from app.database import AsyncSessionLocal, PoolStats, engine_options, to_async_url
+from app.metrics import instrument_engine
+from app.profiling import observe_query
+import asyncio
+import itertools
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Comma-separated read replica URLs; reads use the primary when none are set
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if url.strip()]
+REPLICA_HEALTH_CHECK_INTERVAL = float(os.getenv("REPLICA_HEALTH_CHECK_INTERVAL", 5))
+REPLICA_HEALTH_CHECK_TIMEOUT = float(os.getenv("REPLICA_HEALTH_CHECK_TIMEOUT", 2))
+# Replicas further behind than this are skipped (PostgreSQL only, 0 disables the check)
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", 0))
+
+# Clients that just wrote are pinned to the primary for this long, so they read their own writes
+READ_YOUR_WRITES_SECONDS = int(os.getenv("READ_YOUR_WRITES_SECONDS", 10))
+PIN_COOKIE = "db_pin"
+# Pins skip the replicas and the listing cache, so only honour ones we issued
+pin_signer = TimestampSigner(SECRET_KEY, salt="db-pin")
+
+
+class Replica:
+    """A read replica engine and whether it last passed its health check."""
+
+    def __init__(self, url: str):
+        async_url = to_async_url(url)
+        self.name = make_url(url).render_as_string(hide_password=True)
+        self.pool_stats = PoolStats()
+        self.engine = create_async_engine(
+            async_url, **engine_options(async_url, self.pool_stats, is_async=True)
+        )
+        instrument_engine(self.engine.sync_engine, observe_query)
+        self.sessionmaker = async_sessionmaker(
+            bind=self.engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+        )
+        self.healthy = True
+
+    async def check(self) -> bool:
+        """Return whether the replica answers queries and is not lagging too far behind."""
+        async with self.engine.connect() as conn:
+            if REPLICA_MAX_LAG_SECONDS and self.engine.dialect.name == "postgresql":
+                lag = await conn.scalar(text(
+                    "SELECT COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+                ))
+                return float(lag) <= REPLICA_MAX_LAG_SECONDS
+            await conn.execute(text("SELECT 1"))
+            return True
+
+    def status(self) -> dict:
+        return {"name": self.name, "healthy": self.healthy, **self.pool_stats.as_dict()}
+
+
+class ReplicaRouter:
+    """Picks a healthy replica round-robin for read-only sessions."""
+
+    def __init__(self, urls: list):
+        self.replicas = [Replica(url) for url in urls]
+        self._next = itertools.count()
+
+    def choose(self):
+        """Return the next healthy replica, or None if there is none."""
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[next(self._next) % len(self.replicas)]
+            if replica.healthy:
+                return replica
+        return None
+
+    def read_sessionmaker(self):
+        """Session factory for a read: a healthy replica, else the primary."""
+        replica = self.choose()
+        return replica.sessionmaker if replica is not None else AsyncSessionLocal
+
+    async def check_health(self):
+        """Run one health check against every replica, updating their status."""
+
+        async def check(replica):
+            try:
+                healthy = await asyncio.wait_for(replica.check(), REPLICA_HEALTH_CHECK_TIMEOUT)
+            except Exception as exc:
+                healthy = False
+                logger.debug("Replica %s health check failed: %r", replica.name, exc)
+
+            if healthy != replica.healthy:
+                log = logger.info if healthy else logger.warning
+                log("Replica %s is now %s", replica.name, "healthy" if healthy else "unhealthy")
+            replica.healthy = healthy
+
+        await asyncio.gather(*(check(replica) for replica in self.replicas))
+
+    async def run_health_checks(self, interval: float = REPLICA_HEALTH_CHECK_INTERVAL):
+        """Background task checking replicas until cancelled."""
+        while True:
+            await self.check_health()
+            await asyncio.sleep(interval)
+
+    def status(self) -> list:
+        return [replica.status() for replica in self.replicas]
+
+    def reset_pools_after_fork(self):
+        for replica in self.replicas:
+            replica.engine.sync_engine.dispose(close=False)
+
+    async def dispose(self):
+        await asyncio.gather(*(replica.engine.dispose() for replica in self.replicas))
+
+
+replica_router = ReplicaRouter(DATABASE_REPLICA_URLS)
+
+
+def wants_primary(request: Request) -> bool:
+    """Whether a request must read from the primary to see its own recent writes."""
+    pin = request.cookies.get(PIN_COOKIE)
+    if not pin:
+        return False
+    try:
+        pin_signer.unsign(pin, max_age=READ_YOUR_WRITES_SECONDS)
+    except BadSignature:
+        return False
+    return True
+
+
+def read_sessionmaker(request: Request):
+    """Session factory for a read-only request."""
+    if wants_primary(request):
+        return AsyncSessionLocal
+    return replica_router.read_sessionmaker()
+
+
+def pin_to_primary(response: Response):
+    """Send this client's reads to the primary for a while after it wrote something."""
+    if replica_router.replicas:
+        response.set_cookie(PIN_COOKIE, pin_signer.sign("1").decode(), max_age=READ_YOUR_WRITES_SECONDS, httponly=True, samesite="lax")
+
+
+# Read-only database session dependency, served by a replica when available
+async def get_read_db(request: Request):
+    async with read_sessionmaker(request)() as db:
+        yield db
@@ -0,0 +1,192 @@
+from typing import Any, Dict, List
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, EmailStr, ValidationError
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.auth import require_role, hash_passwords_async
+from app.database import get_db, dialect_insert
+from app.replicas import pin_to_primary, read_sessionmaker
+from app.models import Blog, User
+from app.serialization import dumps
+from app.stats import dashboard_stats
+from app.user_cache import normalize_email
+import csv
+import io
+import os
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_role("admin"))])
+
+# Rows fetched from the server-side cursor per round trip
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 1000))
+
+# Columns included in each export; password hashes are never exported
+BLOG_EXPORT_COLUMNS = [Blog.id, Blog.title, Blog.content, Blog.author]
+USER_EXPORT_COLUMNS = [User.id, User.email, User.role]
+
+# Rows per existence lookup and per multi-row INSERT during user imports
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", 1000))
+MAX_IMPORT_ROWS = int(os.getenv("MAX_IMPORT_ROWS", 50000))
+# Largest CSV upload accepted, read into memory before parsing
+MAX_IMPORT_BYTES = int(os.getenv("MAX_IMPORT_BYTES", 20 * 1024 * 1024))
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+# A single row of a bulk user import
+class UserImport(BaseModel):
+    email: EmailStr
+    password: str
+    role: str = "user"
+
+
+def encode_ndjson(rows, keys) -> bytes:
+    return b"".join(dumps(dict(zip(keys, row))) + b"\n" for row in rows)
+
+def encode_csv(rows, keys) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode()
+
+async def stream_export(sessionmaker, columns, fmt: str):
+    """Yield encoded export chunks, one server-side cursor batch at a time."""
+
+    # The session lives inside the generator so it stays open while the body streams
+    async with sessionmaker() as db:
+        query = select(*columns).order_by(columns[0]).execution_options(yield_per=EXPORT_BATCH_SIZE)
+        result = await db.stream(query)
+
+        keys = list(result.keys())
+        if fmt == "csv":
+            yield encode_csv([keys], keys)
+
+        encode = encode_csv if fmt == "csv" else encode_ndjson
+        async for rows in result.partitions():
+            yield encode(rows, keys)
+
+def export_response(request: Request, columns, fmt: str, name: str) -> StreamingResponse:
+    return StreamingResponse(
+        stream_export(read_sessionmaker(request), columns, fmt),
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{fmt}"'},
+    )
+
+
+@router.get("/export/blogs")
+async def export_blogs(request: Request, format: str = Query("ndjson", pattern="^(ndjson|csv)$")):
+    """Stream every blog as NDJSON or CSV."""
+    return export_response(request, BLOG_EXPORT_COLUMNS, format, "blogs")
+
+
+@router.get("/export/users")
+async def export_users(request: Request, format: str = Query("ndjson", pattern="^(ndjson|csv)$")):
+    """Stream every user, without password hashes, as NDJSON or CSV."""
+    return export_response(request, USER_EXPORT_COLUMNS, format, "users")
+
+
+def batched(items: list, size: int):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+async def import_users(rows: list, db: AsyncSession) -> dict:
+    """Create users from raw rows, returning a per-row result report."""
+    if len(rows) > MAX_IMPORT_ROWS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_IMPORT_ROWS} rows can be imported at once.")
+
+    results = [None] * len(rows)
+    pending = {}  # normalized email -> (row index, validated user)
+
+    # Validate rows and drop duplicates within the upload itself
+    for index, row in enumerate(rows):
+        try:
+            user = UserImport.model_validate(row)
+        except ValidationError as error:
+            email = row.get("email") if isinstance(row, dict) else None
+            results[index] = {"row": index, "email": email, "status": "invalid", "detail": error.errors()[0]["msg"]}
+            continue
+
+        # Emails are unique regardless of case, as in registration and login
+        key = normalize_email(user.email)
+        if key in pending:
+            results[index] = {"row": index, "email": user.email, "status": "duplicate"}
+            continue
+        pending[key] = (index, user)
+
+    # Set-based existence check, instead of one query per row
+    existing = set()
+    for keys in batched(list(pending), IMPORT_BATCH_SIZE):
+        result = await db.execute(select(func.lower(User.email)).where(func.lower(User.email).in_(keys)))
+        existing.update(result.scalars())
+
+    for key in existing:
+        index, user = pending.pop(key)
+        results[index] = {"row": index, "email": user.email, "status": "exists"}
+
+    # Hash in parallel, then insert each batch in one multi-row statement.
+    # Emails created concurrently since the check are skipped by ON CONFLICT,
+    # which covers the unique lower(email) index as well as email itself.
+    to_create = list(pending.values())
+    hashes = await hash_passwords_async([user.password for _, user in to_create])
+    insert = dialect_insert(db)
+    statement = insert(User).on_conflict_do_nothing().returning(User.id, User.email)
+
+    for batch in batched(list(zip(to_create, hashes)), IMPORT_BATCH_SIZE):
+        values = [
+            {"email": user.email, "password": hashed, "role": user.role}
+            for (_, user), hashed in batch
+        ]
+        result = await db.execute(statement, values)
+        created = {email: user_id for user_id, email in result}
+        await db.commit()
+
+        for (index, user), _ in batch:
+            status = "created" if user.email in created else "exists"
+            results[index] = {"row": index, "email": user.email, "status": status}
+            if status == "created":
+                dashboard_stats.user_created(created[user.email], user.email, user.role)
+
+    summary = {}
+    for result in results:
+        summary[result["status"]] = summary.get(result["status"], 0) + 1
+    return {"summary": summary, "results": results}
+
+
+@router.post("/users/import")
+async def import_users_json(rows: List[Dict[str, Any]], response: Response, db: AsyncSession = Depends(get_db)):
+    """Bulk-create users from a JSON array of {email, password, role} objects."""
+    pin_to_primary(response)
+    return await import_users(rows, db)
+
+
+def parse_import_csv(data: bytes) -> list:
+    """Parse an uploaded users CSV into row dicts; runs off the event loop."""
+    try:
+        text = data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="CSV files must be UTF-8 encoded.")
+
+    rows = []
+    try:
+        for row in csv.DictReader(io.StringIO(text, newline="")):
+            if len(rows) >= MAX_IMPORT_ROWS:
+                raise HTTPException(status_code=413, detail=f"At most {MAX_IMPORT_ROWS} rows can be imported at once.")
+            # Let the model default an empty role column
+            rows.append({key: value for key, value in row.items() if value not in (None, "")})
+    except csv.Error as error:
+        raise HTTPException(status_code=400, detail=f"Invalid CSV: {error}")
+    return rows
+
+
+@router.post("/users/import/csv")
+async def import_users_csv(response: Response, file: UploadFile = File(...), db: AsyncSession = Depends(get_db)):
+    """Bulk-create users from a CSV upload with email, password and role columns."""
+    data = await file.read(MAX_IMPORT_BYTES + 1)
+    if len(data) > MAX_IMPORT_BYTES:
+        raise HTTPException(status_code=413, detail=f"CSV uploads are limited to {MAX_IMPORT_BYTES} bytes.")
+    rows = await run_in_threadpool(parse_import_csv, data)
+    pin_to_primary(response)
+    return await import_users(rows, db)
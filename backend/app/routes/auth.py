@@ -1,50 +1,63 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from authlib.integrations.starlette_client import OAuth
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from starlette.requests import Request
 import os
+import time
 from dotenv import load_dotenv
-from sqlalchemy.orm import Session
-from app.database import SessionLocal
-from jose import jwt, JWTError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db
+from app.replicas import pin_to_primary
 from app.models import User
-from app.auth import create_tokens, hash_password, get_current_user, require_role
+from app.auth import hash_password_async, get_current_user, require_role
+from app.tokens import issue_tokens, rotate_refresh_token, revoke_refresh_token
+from app.ratelimit import rate_limit
+from app.stats import dashboard_stats
+from app.user_cache import get_user_by_email, invalidate_user
 from pydantic import BaseModel, EmailStr
 
 # Load environment variables
 load_dotenv()
 
-# JWT Secret & Algorithm
-SECRET_KEY = os.getenv("SECRET_KEY", "thisismysecrectkey")
-ALGORITHM = "HS256"
-ACCESS_TOKEN_EXPIRE_MINUTES = 30
-REFRESH_TOKEN_EXPIRE_DAYS = 5
-
-# Initialize OAuth
-oauth = OAuth()
-oauth.register(
-    name="google",
-    client_id=os.getenv("GOOGLE_CLIENT_ID"),
-    client_secret=os.getenv("GOOGLE_CLIENT_SECRET"),
-    authorize_url="https://accounts.google.com/o/oauth2/auth",
-    access_token_url="https://oauth2.googleapis.com/token",
-    client_kwargs={
-        "scope": "openid email profile",
-        "response_type": "code",
-        "prompt": "consent"
-    },
-    server_metadata_url="https://accounts.google.com/.well-known/openid-configuration"
-)
-
-router = APIRouter(prefix="/auth", tags=["Authentication"])
+# OIDC discovery document and JWKS are refetched after this many seconds
+OAUTH_METADATA_TTL = int(os.getenv("OAUTH_METADATA_TTL", 86400))
+
+_oauth = None
+
+def get_google_client():
+    """Return the Google OAuth client, registering it on first use.
+
+    Authlib (and httpx) are only imported here, so workers that never serve an
+    OAuth login don't pay for them. The client fetches the discovery document and
+    JWKS on first use and keeps them; they are dropped once older than
+    OAUTH_METADATA_TTL so Google's key rotations are picked up.
+    """
+    global _oauth
+    if _oauth is None:
+        from authlib.integrations.starlette_client import OAuth
+
+        oauth = OAuth()
+        oauth.register(
+            name="google",
+            client_id=os.getenv("GOOGLE_CLIENT_ID"),
+            client_secret=os.getenv("GOOGLE_CLIENT_SECRET"),
+            authorize_url="https://accounts.google.com/o/oauth2/auth",
+            access_token_url="https://oauth2.googleapis.com/token",
+            client_kwargs={
+                "scope": "openid email profile",
+                "response_type": "code",
+                "prompt": "consent"
+            },
+            server_metadata_url="https://accounts.google.com/.well-known/openid-configuration"
+        )
+        _oauth = oauth
 
-# Database session dependency
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+    client = _oauth.google
+    loaded_at = client.server_metadata.get("_loaded_at")
+    if loaded_at and time.time() - loaded_at > OAUTH_METADATA_TTL:
+        client.server_metadata.pop("_loaded_at", None)
+        client.server_metadata.pop("jwks", None)
+    return client
 
+router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 # User creation request model
 class UserCreate(BaseModel):
@@ -61,26 +74,28 @@ class RefreshTokenRequest(BaseModel):
 @router.post("/create-user", dependencies=[Depends(require_role("admin"))])
 async def create_user(
     user_data: UserCreate,
-    db: Session = Depends(get_db)
+    response: Response,
+    db: AsyncSession = Depends(get_db)
 ):
     """Admin can create new users"""
 
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
-    if existing_user:
+    if await get_user_by_email(db, user_data.email):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="User with this email already exists."
         )
     
     # Hash the password
-    hashed_password = hash_password(user_data.password)
+    hashed_password = await hash_password_async(user_data.password)
 
     # Create new user
     new_user = User(email=user_data.email, password=hashed_password, role=user_data.role)
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    invalidate_user(new_user.email)
+    dashboard_stats.user_created(new_user.id, new_user.email, new_user.role)
+    pin_to_primary(response)
 
     return {"message": f"User {new_user.email} created successfully with role {new_user.role}"}
 
@@ -88,14 +103,14 @@ async def create_user(
 @router.get("/login/google")
 async def login_google(request: Request):
     """Redirect users to Google Login."""
-    return await oauth.google.authorize_redirect(request, os.getenv("GOOGLE_REDIRECT_URI"))
+    return await get_google_client().authorize_redirect(request, os.getenv("GOOGLE_REDIRECT_URI"))
 
 @router.get("/callback")
-async def auth_callback(request: Request, db: Session = Depends(get_db)):
+async def auth_callback(request: Request, response: Response, db: AsyncSession = Depends(get_db)):
     """Handle OAuth2 callback and authenticate user."""
     
     # Get token response from Google
-    token = await oauth.google.authorize_access_token(request)
+    token = await get_google_client().authorize_access_token(request)
 
     # Extract `id_token` manually
     id_token = token.get("id_token")
@@ -109,39 +124,31 @@ async def auth_callback(request: Request, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="Failed to get user info")
 
     # Check if user exists in the database
-    db_user = db.query(User).filter(User.email == user_info["email"]).first()
+    db_user = await get_user_by_email(db, user_info["email"])
 
     if not db_user:
-        db_user = User(email=user_info["email"], password="oauth", role="user")
-        db.add(db_user)
-        db.commit()
-        db.refresh(db_user)
+        new_user = User(email=user_info["email"], password="oauth", role="user")
+        db.add(new_user)
+        await db.commit()
+        invalidate_user(new_user.email)
+        dashboard_stats.user_created(new_user.id, new_user.email, new_user.role)
+        pin_to_primary(response)
+        db_user = {"email": new_user.email, "role": new_user.role}
 
-    # Generate JWT token
-    tokens = create_tokens(data={"sub": db_user.email, "role": db_user.role})
+    # Generate JWT tokens
+    tokens = await issue_tokens(db, db_user["email"], db_user["role"])
 
     return tokens
 
 # Route to refresh the access token
-@router.post("/refresh")
-async def refresh_access_token(refresh_request: RefreshTokenRequest):
-    """Refresh access token using a valid refresh token."""
-    try:
-        refresh_token = refresh_request.refresh_token
-        payload = jwt.decode(refresh_token, SECRET_KEY, algorithms=[ALGORITHM])
-        email = payload.get("sub")
-
-        if email is None:
-            raise HTTPException(
-                status_code=401,
-                detail="Invalid refresh token!"
-            )
-
-        # Generate new access token
-        new_access_token = create_tokens(data={"sub": email})
-        return {"access_token": new_access_token, "token_type": "bearer"}
-    except JWTError:
-        raise HTTPException(
-            status_code=401,
-            detail="Could not validate refresh token!"
-        )
\ No newline at end of file
+@router.post("/refresh", dependencies=[Depends(rate_limit("refresh"))])
+async def refresh_access_token(refresh_request: RefreshTokenRequest, db: AsyncSession = Depends(get_db)):
+    """Exchange a refresh token for a new token pair; the old refresh token stops working."""
+    return await rotate_refresh_token(db, refresh_request.refresh_token)
+
+# Route to revoke a refresh token (logout)
+@router.post("/revoke")
+async def revoke_token(refresh_request: RefreshTokenRequest, db: AsyncSession = Depends(get_db)):
+    """Revoke a refresh token so it can no longer be used."""
+    await revoke_refresh_token(db, refresh_request.refresh_token)
+    return {"message": "Refresh token revoked"}
@@ -1,24 +1,301 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.auth import require_role
-from app.database import SessionLocal
+from app.cache import LRUCache, make_etag, etag_matches
+from app.database import get_db
+from app.rendering import get_renders
+from app.replicas import get_read_db, pin_to_primary, wants_primary
 from app.models import Blog
+from app.schemas import (
+    BlogBulkDelete, BlogBulkDeleteResult, BlogCreate, BlogOut, BlogPage, BlogSearchPage, BlogSummaryPage, BlogUpdate,
+    BlogRendered, BlogRenderedPage, PopularBlog,
+)
+from app.search import search_blogs
+from app.serialization import ORJSONResponse, dumps, rows_to_dicts
+from app.stats import dashboard_stats
+from app.views import POPULAR_SIZE, blog_generation, get_popular_blogs, popular_cache, view_counter
+import os
 
 router = APIRouter(prefix="/blogs", tags=["Blogs"])
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Page size bounds for blog listings
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
 
-@router.get("/")
-def get_blogs(db: Session = Depends(get_db)):
-    return db.query(Blog).all()
+# Search results page size bounds
+DEFAULT_SEARCH_PAGE_SIZE = 10
+MAX_SEARCH_PAGE_SIZE = 50
 
+# Number of characters of content returned as an excerpt in summary listings
+EXCERPT_LENGTH = 200
 
-@router.delete("/blogs/{blog_id}")
-async def delete_blog(blog_id: int, user: dict = Depends(require_role("admin"))):
+# Serialized blog listing pages, cleared whenever blogs are written or deleted.
+# Workers forked by app.serve clear together; other hosts (and spawned workers)
+# only expire pages, so they may serve listings up to BLOG_CACHE_TTL old, plus
+# BLOG_CACHE_MAX_AGE in clients and CDNs.
+BLOG_CACHE_SIZE = int(os.getenv("BLOG_CACHE_SIZE", 256))
+BLOG_CACHE_TTL = float(os.getenv("BLOG_CACHE_TTL", 30))
+# How long clients and CDNs may reuse a listing without revalidating
+BLOG_CACHE_MAX_AGE = int(os.getenv("BLOG_CACHE_MAX_AGE", 30))
+blog_list_cache = LRUCache(maxsize=BLOG_CACHE_SIZE, ttl=BLOG_CACHE_TTL, shared_generation=blog_generation)
+
+# Limits for bulk writes; ids are deleted in IN lists of BULK_BATCH_SIZE
+MAX_BULK_BLOGS = int(os.getenv("MAX_BULK_BLOGS", 10000))
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", 1000))
+
+BLOG_COLUMNS = [Blog.id, Blog.title, Blog.content, Blog.author]
+
+def invalidate_blog_cache():
+    """Drop cached blog listings after a blog write."""
+    blog_list_cache.clear()
+    popular_cache.clear()
+
+@router.get("/", response_model=Union[BlogPage, BlogSummaryPage, BlogRenderedPage])
+async def get_blogs(
+    request: Request,
+    cursor: Optional[int] = Query(None, ge=0, description="Return blogs with an id greater than this cursor"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    summary: bool = Query(False, description="Return title, author and excerpt instead of the full content"),
+    render: bool = Query(False, description="Include sanitized HTML, excerpt and reading time (ignored with summary)"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """List blogs ordered by id, one keyset page at a time."""
+
+    render = render and not summary
+    key = (cursor, limit, summary, render)
+    # Clients reading their own writes skip pages cached by other workers or from replicas
+    pinned = wants_primary(request)
+    cached = None if pinned else blog_list_cache.get(key)
+    if cached is None:
+        generation = blog_list_cache.generation
+
+        # Only select the columns we return, so summaries never load the full content
+        if summary:
+            columns = [
+                Blog.id,
+                Blog.title,
+                Blog.author,
+                func.substr(Blog.content, 1, EXCERPT_LENGTH).label("excerpt"),
+            ]
+        else:
+            columns = [Blog.id, Blog.title, Blog.content, Blog.author]
+
+        query = select(*columns)
+        if cursor is not None:
+            query = query.where(Blog.id > cursor)
+
+        # Fetch one extra row to know whether another page exists
+        result = await db.execute(query.order_by(Blog.id).limit(limit + 1))
+        rows = rows_to_dicts(result)
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        if render:
+            renders = await get_renders(db, [(row["id"], row["content"]) for row in rows])
+            rows = [{**row, **renders[row["id"]]} for row in rows]
+
+        body = dumps({
+            "items": rows,
+            "next_cursor": rows[-1]["id"] if has_more else None,
+        })
+        cached = (body, make_etag(body))
+
+        # Skip caching if blogs changed while we were querying
+        if blog_list_cache.generation == generation:
+            blog_list_cache.set(key, cached)
+
+    body, etag = cached
+    # Pinned clients must not reuse (or have a CDN share) pages older than their write
+    cache_control = "private, no-cache" if pinned else f"public, max-age={BLOG_CACHE_MAX_AGE}"
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get("/search", response_model=BlogSearchPage)
+async def search(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(DEFAULT_SEARCH_PAGE_SIZE, ge=1, le=MAX_SEARCH_PAGE_SIZE),
+    offset: int = Query(0, ge=0, le=1000),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Full-text search over blog titles and content, best matches first."""
+
+    # Fetch one extra hit to know whether another page exists
+    rows = await search_blogs(db, q, limit + 1, offset)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    return ORJSONResponse({
+        "items": rows,
+        "next_offset": offset + limit if has_more else None,
+    })
+
+
+@router.get("/popular", response_model=List[PopularBlog])
+async def popular_blogs(
+    limit: int = Query(10, ge=1, le=POPULAR_SIZE),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Most viewed blogs, most views first."""
+    return ORJSONResponse(await get_popular_blogs(db, limit))
+
+
+@router.get("/{blog_id}", response_model=Union[BlogOut, BlogRendered])
+async def get_blog(
+    blog_id: int,
+    render: bool = Query(False, description="Include sanitized HTML, excerpt and reading time"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Return a single blog and count the view."""
+    result = await db.execute(select(*BLOG_COLUMNS).where(Blog.id == blog_id))
+    rows = rows_to_dicts(result)
+    if not rows:
+        raise HTTPException(status_code=404, detail="Blog not found.")
+    blog = rows[0]
+
+    if render:
+        renders = await get_renders(db, [(blog["id"], blog["content"])])
+        blog.update(renders[blog["id"]])
+
+    # Buffered in memory and written in batches, so reads stay read-only
+    view_counter.record(blog_id)
+    return ORJSONResponse(blog)
+
+
+@router.post("/", response_model=BlogOut, status_code=status.HTTP_201_CREATED)
+async def create_blog(
+    blog: BlogCreate,
+    response: Response,
+    user: dict = Depends(require_role("admin")),
+    db: AsyncSession = Depends(get_db)
+):
+    """Create a blog, returning it with its id."""
+    result = await db.execute(
+        insert(Blog)
+        .values(title=blog.title, content=blog.content, author=blog.author or user["email"])
+        .returning(*BLOG_COLUMNS)
+    )
+    created = rows_to_dicts(result)[0]
+    await db.commit()
+
+    dashboard_stats.blogs_created([created["author"]])
+    invalidate_blog_cache()
+    pin_to_primary(response)
+    return created
+
+
+@router.post("/bulk", response_model=List[BlogOut], status_code=status.HTTP_201_CREATED)
+async def create_blogs(
+    blogs: List[BlogCreate],
+    user: dict = Depends(require_role("admin")),
+    db: AsyncSession = Depends(get_db)
+):
+    """Create many blogs in one transaction, returning them ordered by id."""
+    if len(blogs) > MAX_BULK_BLOGS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BULK_BLOGS} blogs can be created at once.")
+    if not blogs:
+        return ORJSONResponse([], status_code=status.HTTP_201_CREATED)
+
+    # One executemany INSERT ... RETURNING; SQLAlchemy batches it into multi-row VALUES
+    rows = [
+        {"title": blog.title, "content": blog.content, "author": blog.author or user["email"]}
+        for blog in blogs
+    ]
+    result = await db.execute(
+        insert(Blog).returning(*BLOG_COLUMNS), rows
+    )
+    created = sorted(rows_to_dicts(result), key=lambda row: row["id"])
+    await db.commit()
+
+    dashboard_stats.blogs_created([row["author"] for row in created])
+    invalidate_blog_cache()
+    # Set on the response actually returned; the injected one is discarded
+    response = ORJSONResponse(created, status_code=status.HTTP_201_CREATED)
+    pin_to_primary(response)
+    return response
+
+
+@router.post("/bulk-delete", response_model=BlogBulkDeleteResult)
+async def delete_blogs(
+    request: BlogBulkDelete,
+    response: Response,
+    user: dict = Depends(require_role("admin")),
+    db: AsyncSession = Depends(get_db)
+):
+    """Delete many blogs by id in one transaction, reporting ids that did not exist."""
+    ids = list(dict.fromkeys(request.ids))
+    if len(ids) > MAX_BULK_BLOGS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_BULK_BLOGS} blogs can be deleted at once.")
+
+    deleted = []
+    for i in range(0, len(ids), BULK_BATCH_SIZE):
+        result = await db.execute(
+            delete(Blog).where(Blog.id.in_(ids[i:i + BULK_BATCH_SIZE])).returning(Blog.id, Blog.author)
+        )
+        deleted.extend(result.all())
+    await db.commit()
+
+    dashboard_stats.blogs_deleted([row.author for row in deleted])
+    invalidate_blog_cache()
+    pin_to_primary(response)
+    found = {row.id for row in deleted}
+    return {"deleted": sorted(found), "missing": [blog_id for blog_id in ids if blog_id not in found]}
+
+
+@router.patch("/{blog_id}", response_model=BlogOut)
+async def update_blog(
+    blog_id: int,
+    blog: BlogUpdate,
+    response: Response,
+    user: dict = Depends(require_role("admin")),
+    db: AsyncSession = Depends(get_db)
+):
+    """Update the given fields of a blog."""
+    values = blog.model_dump(exclude_unset=True, exclude_none=True)
+
+    # Author changes move the blog between dashboard counters
+    old_author = None
+    if "author" in values:
+        old_author = await db.scalar(select(Blog.author).where(Blog.id == blog_id))
+
+    if values:
+        query = update(Blog).where(Blog.id == blog_id).values(**values).returning(*BLOG_COLUMNS)
+    else:
+        query = select(*BLOG_COLUMNS).where(Blog.id == blog_id)
+    result = await db.execute(query)
+    rows = rows_to_dicts(result)
+    if not rows:
+        raise HTTPException(status_code=404, detail="Blog not found.")
+    await db.commit()
+
+    if old_author is not None and old_author != rows[0]["author"]:
+        dashboard_stats.blogs_deleted([old_author])
+        dashboard_stats.blogs_created([rows[0]["author"]])
+    if values:
+        invalidate_blog_cache()
+        pin_to_primary(response)
+    return rows[0]
+
+
+@router.delete("/{blog_id}")
+async def delete_blog(
+    blog_id: int,
+    response: Response,
+    user: dict = Depends(require_role("admin")),
+    db: AsyncSession = Depends(get_db)
+):
     """Only admin users can delete blogs."""
-    return {"message": f"Blog {blog_id} deleted by {user['email']}"}
\ No newline at end of file
+    result = await db.execute(delete(Blog).where(Blog.id == blog_id).returning(Blog.author))
+    author = result.scalar_one_or_none()
+    if author is None:
+        raise HTTPException(status_code=404, detail="Blog not found.")
+    await db.commit()
+
+    dashboard_stats.blogs_deleted([author])
+    invalidate_blog_cache()
+    pin_to_primary(response)
+    return {"message": f"Blog {blog_id} deleted by {user['email']}"}
@@ -1,46 +1,53 @@
 from fastapi import APIRouter, Depends, HTTPException
 from app.auth import get_current_user, require_role
-from sqlalchemy.orm import Session
-from app.database import SessionLocal
-from app.models import User
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_pool_stats
+from app.replicas import get_read_db, replica_router
+from app.schemas import UserOut
+from app.stats import dashboard_stats
+from app.user_cache import get_user_by_email, normalize_email
 
 router = APIRouter(prefix="/protected", tags=["Protected Routes"])
 
-# Database session dependency
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 # Only admins can access this
 @router.get("/dashboard")
 async def admin_dashboard(user: dict = Depends(require_role("admin"))):
     """Allow only admin users to view the dashboard."""
     return {"message": f"Welcome to the admin dashboard, {user['email']}!"}
 
+# Precomputed dashboard statistics, admins only
+@router.get("/dashboard/stats")
+async def admin_dashboard_stats(user: dict = Depends(require_role("admin"))):
+    """Return user counts by role, blog counts by author and recent signups."""
+    return dashboard_stats.snapshot()
+
+# Connection pool statistics for monitoring
+@router.get("/db-pool")
+async def db_pool_stats(user: dict = Depends(require_role("admin"))):
+    """Return database connection pool occupancy and checkout wait times."""
+    return {**get_pool_stats(), "replicas": replica_router.status()}
+
 # All authenticated users can access this
-@router.get("/profile/{email}")
+@router.get("/profile/{email}", response_model=UserOut)
 async def user_profile(
     email: str,
     user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Users can only view their own profile, but admins can view any profile"""
 
     # If the user is NOT an admin, they can ONLY view their own profile
-    if user.get('role', '').lower() != 'admin' and user.get('email', '') != email:
+    if user.get('role', '').lower() != 'admin' and normalize_email(user.get('email', '')) != normalize_email(email):
         raise HTTPException(
             status_code=403,
             detail="Access denied: You can only view your own profile."
         )
 
-    # Fetch user from the database
-    db_user = db.query(User).filter(User.email == email).first()
+    # Fetch user from the cache, falling back to the database
+    db_user = await get_user_by_email(db, email)
     if not db_user:
         raise HTTPException(
             status_code=404,
             detail="User not found."
         )
-    return {"email": db_user.email, "role": db_user.role}
+    return db_user
@@ -1,23 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, EmailStr
-from datetime import timedelta
-from app.database import SessionLocal
+from app.database import get_db
+from app.replicas import pin_to_primary
 from app.models import User
-from app.auth import hash_password, verify_password, create_tokens
+from app.auth import hash_password_async, verify_and_update_password_async
+from app.tokens import issue_tokens
+from app.ratelimit import rate_limit
+from app.stats import dashboard_stats
+from app.user_cache import get_user_by_email, invalidate_user, normalize_email
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
 
-# Database session dependency
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
 # User Registration Schema
 class UserCreate(BaseModel):
     email: EmailStr
@@ -30,38 +26,49 @@ class UserLogin(BaseModel):
 
 
 # Register New User
-@router.post("/register")
-def register_user(user: UserCreate, db: Session = Depends(get_db)):
+@router.post("/register", dependencies=[Depends(rate_limit("register", by_email=True))])
+async def register_user(user: UserCreate, response: Response, db: AsyncSession = Depends(get_db)):
     """Register a new user with hashed password."""
     
     # Check if the email already exists
-    existing_user = db.query(User).filter(User.email == user.email).first()
-    if existing_user:
+    if await get_user_by_email(db, user.email):
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Hash the password before storing
-    hashed_password = hash_password(user.password)
+    hashed_password = await hash_password_async(user.password)
 
     # Create new user
     new_user = User(email=user.email, password=hashed_password, role="user")
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    invalidate_user(user.email)
+    dashboard_stats.user_created(new_user.id, new_user.email, new_user.role)
+    pin_to_primary(response)
 
     return {"message":"User registered successfully"}
 
 
 # Login Route
-@router.post("/login")
-def login_user(user: UserLogin, db: Session = Depends(get_db)):
+@router.post("/login", dependencies=[Depends(rate_limit("login", by_email=True))])
+async def login_user(user: UserLogin, db: AsyncSession = Depends(get_db)):
     """Authenticate user and return JWT token."""
 
     # Find user by email
-    db_user = db.query(User).filter(User.email == user.email).first()
-    if not db_user or not verify_password(user.password, db_user.password):
+    result = await db.execute(select(User).where(func.lower(User.email) == normalize_email(user.email)))
+    db_user = result.scalar_one_or_none()
+    if not db_user:
         raise HTTPException(status_code=400, detail="Invalid credentials!")
+
+    valid, new_hash = await verify_and_update_password_async(user.password, db_user.password)
+    if not valid:
+        raise HTTPException(status_code=400, detail="Invalid credentials!")
+
+    # Transparently rehash when the hashing policy (e.g. bcrypt cost) has changed
+    if new_hash:
+        db_user.password = new_hash
+        await db.commit()
     
-    # Generate JWT token
-    tokens = create_tokens(data={"sub": db_user.email}, expires_delta=timedelta(minutes=30))
+    # Generate JWT tokens
+    tokens = await issue_tokens(db, db_user.email, db_user.role)
 
     return tokens
@@ -0,0 +1,100 @@
+from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field
+
+
+# Blog as stored, with its full content
+class BlogOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    title: str
+    content: str
+    author: str
+
+
+# Blog with its server-rendered, sanitized HTML body
+class BlogRendered(BlogOut):
+    html: str
+    excerpt: str
+    word_count: int
+    reading_time_minutes: int
+
+
+class BlogRenderedPage(BaseModel):
+    items: List[BlogRendered]
+    next_cursor: Optional[int] = None
+
+
+# New blog; the author defaults to the creating user's email
+class BlogCreate(BaseModel):
+    title: str = Field(..., min_length=1)
+    content: str
+    author: Optional[str] = None
+
+
+# Partial blog update; only fields that are sent are changed
+class BlogUpdate(BaseModel):
+    title: Optional[str] = Field(None, min_length=1)
+    content: Optional[str] = None
+    author: Optional[str] = None
+
+
+# Ids of blogs to delete in one call
+class BlogBulkDelete(BaseModel):
+    ids: List[int] = Field(..., min_length=1)
+
+
+class BlogBulkDeleteResult(BaseModel):
+    deleted: List[int]
+    missing: List[int]
+
+
+# Blog listing entry without the full content
+class BlogSummary(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    title: str
+    author: str
+    excerpt: str
+
+
+# One keyset page of blogs; pass next_cursor as ?cursor= to get the next page
+class BlogPage(BaseModel):
+    items: List[BlogOut]
+    next_cursor: Optional[int] = None
+
+
+class BlogSummaryPage(BaseModel):
+    items: List[BlogSummary]
+    next_cursor: Optional[int] = None
+
+
+# Full-text search hit; snippet is escaped HTML with matches in <b> tags
+class BlogSearchHit(BaseModel):
+    id: int
+    title: str
+    author: str
+    rank: float
+    snippet: str
+
+
+class BlogSearchPage(BaseModel):
+    items: List[BlogSearchHit]
+    next_offset: Optional[int] = None
+
+
+# Entry in the most-read blogs list
+class PopularBlog(BaseModel):
+    id: int
+    title: str
+    author: str
+    views: int
+
+
+# User as exposed by the API, never including the password hash
+class UserOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    email: str
+    role: Optional[str] = None
@@ -0,0 +1,98 @@
+from sqlalchemy import and_, case, func, literal, or_, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Blog
+from app.serialization import rows_to_dicts
+import html
+
+# Tags wrapped around matched terms in snippets, which are HTML with the content escaped
+SNIPPET_START = "<b>"
+SNIPPET_STOP = "</b>"
+# Private-use characters the database marks matches with, replaced by the tags after escaping
+MATCH_START = "\ue000"
+MATCH_STOP = "\ue001"
+
+# Characters of content returned as the snippet by the fallback search
+FALLBACK_SNIPPET_LENGTH = 200
+
+# Rank first, then build headlines only for the rows on the requested page
+POSTGRES_SEARCH = text(f"""
+    WITH query AS (SELECT websearch_to_tsquery('english', :q) AS q),
+    hits AS (
+        SELECT b.id, ts_rank_cd(b.search_vector, query.q) AS rank
+        FROM blogs b, query
+        WHERE b.search_vector @@ query.q
+        ORDER BY rank DESC, b.id
+        LIMIT :limit OFFSET :offset
+    )
+    SELECT b.id, b.title, b.author, hits.rank,
+           ts_headline('english', b.content, query.q,
+                       'StartSel={MATCH_START}, StopSel={MATCH_STOP}, MaxWords=30, MinWords=10') AS snippet
+    FROM hits JOIN blogs b ON b.id = hits.id, query
+    ORDER BY hits.rank DESC, b.id
+""")
+
+# bm25() is lower for better matches; title hits weigh more than content hits
+SQLITE_SEARCH = text(f"""
+    SELECT b.id, b.title, b.author, -bm25(blogs_fts, 10.0, 1.0) AS rank,
+           snippet(blogs_fts, 1, '{MATCH_START}', '{MATCH_STOP}', '...', 30) AS snippet
+    FROM blogs_fts JOIN blogs b ON b.id = blogs_fts.rowid
+    WHERE blogs_fts MATCH :q
+    ORDER BY rank DESC, b.id
+    LIMIT :limit OFFSET :offset
+""")
+
+
+def fallback_search(q: str, limit: int, offset: int):
+    """Substring search for databases without a full-text index.
+
+    Every term must appear in the title or content; blogs with all terms in the title rank first.
+    """
+    terms = q.split()
+    title_matches = [Blog.title.icontains(term, autoescape=True) for term in terms]
+    rank = case((and_(*title_matches), literal(1.0)), else_=literal(0.5)).label("rank")
+    return (
+        select(
+            Blog.id,
+            Blog.title,
+            Blog.author,
+            rank,
+            func.substr(Blog.content, 1, FALLBACK_SNIPPET_LENGTH).label("snippet"),
+        )
+        .where(*(
+            or_(title_match, Blog.content.icontains(term, autoescape=True))
+            for term, title_match in zip(terms, title_matches)
+        ))
+        .order_by(rank.desc(), Blog.id)
+        .limit(limit)
+        .offset(offset)
+    )
+
+
+def to_fts5_query(q: str) -> str:
+    """Quote each term so user input can't inject FTS5 query syntax."""
+    return " ".join('"' + term.replace('"', '""') + '"' for term in q.split())
+
+
+def highlight(snippet: str) -> str:
+    """Escape a snippet as HTML, then turn the database's match markers into tags."""
+    return html.escape(snippet).replace(MATCH_START, SNIPPET_START).replace(MATCH_STOP, SNIPPET_STOP)
+
+
+async def search_blogs(db: AsyncSession, q: str, limit: int, offset: int = 0):
+    """Return ranked blog hits for a free-text query, with HTML snippets safe to render."""
+    if not q.split():
+        return []
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        statement, params = POSTGRES_SEARCH, {"q": q, "limit": limit, "offset": offset}
+    elif dialect == "sqlite":
+        statement, params = SQLITE_SEARCH, {"q": to_fts5_query(q), "limit": limit, "offset": offset}
+    else:
+        statement, params = fallback_search(q, limit, offset), {}
+
+    result = await db.execute(statement, params)
+    rows = rows_to_dicts(result)
+    for row in rows:
+        row["snippet"] = highlight(row["snippet"])
+    return rows
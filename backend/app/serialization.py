@@ -0,0 +1,24 @@
+from fastapi.responses import JSONResponse
+import orjson
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson, which is several times faster than json."""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def dumps(content) -> bytes:
+    """Serialize plain Python data to JSON bytes."""
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def rows_to_dicts(result) -> list:
+    """Turn Core result rows into dicts by zipping column names with each row tuple.
+
+    This skips ORM instances and per-object attribute lookups, so the data can be
+    returned directly without going through jsonable_encoder.
+    """
+    keys = list(result.keys())
+    return [dict(zip(keys, row)) for row in result]
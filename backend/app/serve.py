@@ -0,0 +1,168 @@
+"""Production server entry point.
+
+    python -m app.serve
+
+Runs the API under gunicorn with uvicorn workers, one per CPU core by
+default. The app is imported once in the master before forking, so workers
+share its code copy-on-write; each worker then opens its own database
+connections and runs its own lifespan (background tasks, pool shutdown).
+Each worker has its own pool, so the database sees up to
+WEB_CONCURRENCY * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections.
+
+On SIGTERM workers stop accepting connections, finish in-flight requests,
+flush buffered writes and close their pools; anything still running after
+GRACEFUL_TIMEOUT is killed. Without gunicorn (e.g. on Windows) it falls back
+to uvicorn's own process manager, without preloading or recycle jitter.
+"""
+import logging
+import os
+from dotenv import load_dotenv
+
+try:
+    from gunicorn.app.base import BaseApplication
+    from uvicorn_worker import UvicornWorker
+except ImportError:
+    BaseApplication = UvicornWorker = None
+
+# Load environment variables
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+
+def available_cores() -> int:
+    """CPU cores this process may run on, which respects container CPU sets."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+# Server settings
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", 8000))
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", available_cores()))
+# Pending connections the kernel queues while all workers are busy
+BACKLOG = int(os.getenv("BACKLOG", 2048))
+# Seconds an idle keep-alive connection stays open. It must exceed the load balancer's
+# idle timeout (commonly 60s), or the balancer reuses connections we just closed and
+# returns 502s; raise it if yours is longer.
+KEEPALIVE = int(os.getenv("KEEPALIVE", 75))
+# Recycle each worker after this many requests (0 disables), spread by up to the jitter
+# so workers don't all restart at once
+MAX_REQUESTS = int(os.getenv("MAX_REQUESTS", 10000))
+MAX_REQUESTS_JITTER = int(os.getenv("MAX_REQUESTS_JITTER", 1000))
+# Seconds a worker may go silent before the master restarts it
+WORKER_TIMEOUT = int(os.getenv("WORKER_TIMEOUT", 60))
+# Seconds workers get to drain on SIGTERM before being killed
+GRACEFUL_TIMEOUT = int(os.getenv("GRACEFUL_TIMEOUT", 30))
+# Proxy addresses trusted to set X-Forwarded-For/-Proto
+FORWARDED_ALLOW_IPS = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+# Access log destination ("-" for stdout), off by default as /metrics covers requests
+ACCESS_LOG = os.getenv("ACCESS_LOG") or None
+LOG_LEVEL = os.getenv("LOG_LEVEL", "info")
+
+# Part of the drain budget kept for lifespan shutdown (flushing views, closing pools)
+SHUTDOWN_RESERVE = 5
+
+
+def drain_timeout() -> int:
+    """Seconds uvicorn waits for in-flight requests, leaving time for lifespan shutdown."""
+    return max(1, GRACEFUL_TIMEOUT - SHUTDOWN_RESERVE)
+
+
+if UvicornWorker is not None:
+
+    class Worker(UvicornWorker):
+        """Uvicorn worker using uvloop and httptools when installed, with a bounded drain."""
+
+        CONFIG_KWARGS = {
+            "loop": "auto",
+            "http": "auto",
+            # Fail worker boot instead of serving without background tasks
+            "lifespan": "on",
+            "timeout_graceful_shutdown": drain_timeout(),
+        }
+
+
+def post_fork(server, worker):
+    """Give each worker its own database connections instead of the master's."""
+    from app.database import reset_pools_after_fork
+    from app.replicas import replica_router
+
+    reset_pools_after_fork()
+    replica_router.reset_pools_after_fork()
+
+
+def gunicorn_options() -> dict:
+    return {
+        "bind": f"{HOST}:{PORT}",
+        "workers": WEB_CONCURRENCY,
+        "worker_class": Worker,
+        "preload_app": True,
+        "backlog": BACKLOG,
+        "keepalive": KEEPALIVE,
+        "max_requests": MAX_REQUESTS,
+        "max_requests_jitter": MAX_REQUESTS_JITTER if MAX_REQUESTS else 0,
+        "timeout": WORKER_TIMEOUT,
+        "graceful_timeout": GRACEFUL_TIMEOUT,
+        "forwarded_allow_ips": FORWARDED_ALLOW_IPS,
+        "accesslog": ACCESS_LOG,
+        "errorlog": "-",
+        "loglevel": LOG_LEVEL,
+        "post_fork": post_fork,
+    }
+
+
+if BaseApplication is not None:
+
+    class Server(BaseApplication):
+        """Gunicorn application configured from gunicorn_options() rather than the command line."""
+
+        def __init__(self, options: dict):
+            self.options = options
+            super().__init__()
+
+        def load_config(self):
+            for key, value in self.options.items():
+                if value is not None:
+                    self.cfg.set(key, value)
+
+        def load(self):
+            from app.main import app
+
+            return app
+
+
+def run_uvicorn():
+    import uvicorn
+
+    logger.warning("gunicorn or uvicorn-worker is not installed, serving with uvicorn's process manager")
+    uvicorn.run(
+        "app.main:app",
+        host=HOST,
+        port=PORT,
+        workers=WEB_CONCURRENCY,
+        loop="auto",
+        http="auto",
+        lifespan="on",
+        backlog=BACKLOG,
+        timeout_keep_alive=KEEPALIVE,
+        limit_max_requests=MAX_REQUESTS or None,
+        timeout_graceful_shutdown=drain_timeout(),
+        forwarded_allow_ips=FORWARDED_ALLOW_IPS,
+        access_log=ACCESS_LOG is not None,
+        log_level=LOG_LEVEL,
+    )
+
+
+def main():
+    if BaseApplication is None:
+        logging.basicConfig(level=LOG_LEVEL.upper())
+        run_uvicorn()
+        return
+    Server(gunicorn_options()).run()
+
+
+if __name__ == "__main__":
+    main()
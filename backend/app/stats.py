@@ -0,0 +1,157 @@
+from collections import deque
+from datetime import datetime
+from sqlalchemy import func, select
+from app.database import AsyncSessionLocal
+from app.models import Blog, User
+import asyncio
+import heapq
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Full recounts correct drift, e.g. from writes handled by other workers
+STATS_RECONCILE_INTERVAL = float(os.getenv("STATS_RECONCILE_INTERVAL", 300))
+STATS_RECENT_SIGNUPS = int(os.getenv("STATS_RECENT_SIGNUPS", 10))
+STATS_TOP_AUTHORS = int(os.getenv("STATS_TOP_AUTHORS", 20))
+# Recounts disturbed by this worker's own writes are retried up to this many times
+STATS_RECONCILE_ATTEMPTS = int(os.getenv("STATS_RECONCILE_ATTEMPTS", 3))
+
+
+def add_count(counters: dict, key, change: int):
+    """Adjust a counter, dropping it once it reaches zero."""
+    count = counters.get(key, 0) + change
+    if count > 0:
+        counters[key] = count
+    else:
+        counters.pop(key, None)
+
+
+class StatsDelta:
+    """Counter changes this worker made while a recount was running."""
+
+    def __init__(self):
+        self.users_by_role = {}
+        self.blogs_by_author = {}
+        self.signups = []
+        self.writes = 0
+
+    def count(self, counters: dict, key, change: int):
+        counters[key] = counters.get(key, 0) + change
+        self.writes += 1
+
+
+class DashboardStats:
+    """Admin dashboard counters, updated as users and blogs are written.
+
+    Write paths adjust the counters in place, so serving the dashboard never
+    queries the tables. Each worker only sees its own writes between
+    reconciles, which replace the counters with a fresh GROUP BY recount.
+    """
+
+    def __init__(self):
+        self.users_by_role = {}
+        self.blogs_by_author = {}
+        self.recent_signups = deque(maxlen=STATS_RECENT_SIGNUPS)
+        self.reconciled_at = None
+        self._snapshot = None
+        # Set while a recount runs, so its result can account for writes made meanwhile
+        self._delta = None
+
+    def user_created(self, user_id: int, email: str, role: str):
+        signup = {"id": user_id, "email": email, "role": role}
+        add_count(self.users_by_role, role, 1)
+        self.recent_signups.appendleft(signup)
+        if self._delta is not None:
+            self._delta.count(self._delta.users_by_role, role, 1)
+            self._delta.signups.append(signup)
+        self._snapshot = None
+
+    def blogs_created(self, authors: list):
+        self._count_blogs(authors, 1)
+
+    def blogs_deleted(self, authors: list):
+        self._count_blogs(authors, -1)
+
+    def _count_blogs(self, authors: list, change: int):
+        for author in authors:
+            add_count(self.blogs_by_author, author, change)
+            if self._delta is not None:
+                self._delta.count(self._delta.blogs_by_author, author, change)
+        self._snapshot = None
+
+    def snapshot(self) -> dict:
+        """Return the dashboard payload, rebuilt only after the counters change."""
+        if self._snapshot is None:
+            top_authors = heapq.nlargest(STATS_TOP_AUTHORS, self.blogs_by_author.items(), key=lambda item: item[1])
+            self._snapshot = {
+                "total_users": sum(self.users_by_role.values()),
+                "users_by_role": dict(self.users_by_role),
+                "recent_signups": list(self.recent_signups),
+                "total_blogs": sum(self.blogs_by_author.values()),
+                "total_authors": len(self.blogs_by_author),
+                "top_authors": [{"author": author, "blogs": count} for author, count in top_authors],
+                "reconciled_at": self.reconciled_at,
+            }
+        return self._snapshot
+
+    async def reconcile(self, attempts: int = STATS_RECONCILE_ATTEMPTS):
+        """Replace the counters with a full recount from the database.
+
+        A write this worker makes while the recount runs may or may not be in
+        it, so the recount is retried until one runs undisturbed. If the last
+        attempt is still disturbed, its writes are replayed on top of it, which
+        can briefly count a write twice until the next reconcile.
+        """
+        for _ in range(max(attempts, 1)):
+            self._delta = delta = StatsDelta()
+            try:
+                users_by_role, blogs_by_author, recent_signups = await self._recount()
+            finally:
+                self._delta = None
+            if not delta.writes:
+                break
+
+        for role, change in delta.users_by_role.items():
+            add_count(users_by_role, role, change)
+        for author, change in delta.blogs_by_author.items():
+            add_count(blogs_by_author, author, change)
+        recounted = {signup["id"] for signup in recent_signups}
+        for signup in delta.signups:
+            if signup["id"] not in recounted:
+                recent_signups.appendleft(signup)
+
+        self.users_by_role = users_by_role
+        self.blogs_by_author = blogs_by_author
+        self.recent_signups = recent_signups
+        self.reconciled_at = datetime.utcnow().isoformat()
+        self._snapshot = None
+
+    async def _recount(self) -> tuple:
+        async with AsyncSessionLocal() as db:
+            users = await db.execute(select(User.role, func.count()).group_by(User.role))
+            blogs = await db.execute(select(Blog.author, func.count()).group_by(Blog.author))
+            recent = await db.execute(
+                select(User.id, User.email, User.role).order_by(User.id.desc()).limit(STATS_RECENT_SIGNUPS)
+            )
+            return (
+                {role: count for role, count in users},
+                {author: count for author, count in blogs},
+                deque(
+                    ({"id": row.id, "email": row.email, "role": row.role} for row in recent),
+                    maxlen=STATS_RECENT_SIGNUPS,
+                ),
+            )
+
+
+dashboard_stats = DashboardStats()
+
+
+async def run_stats_reconciler(interval: float = STATS_RECONCILE_INTERVAL):
+    """Background task recounting dashboard statistics, starting immediately, until cancelled."""
+    while True:
+        try:
+            await dashboard_stats.reconcile()
+        except Exception:
+            logger.exception("Reconciling dashboard statistics failed")
+        await asyncio.sleep(interval)
@@ -0,0 +1,163 @@
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.auth import REFRESH_TOKEN_EXPIRE_DAYS, create_tokens, decode_token
+from app.cache import LRUCache
+from app.database import AsyncSessionLocal
+from app.models import RefreshToken
+from app.user_cache import get_user_by_email, invalidate_user
+import asyncio
+import logging
+import os
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# Recently revoked refresh token ids, so replays are rejected without a DB round trip
+REVOKED_CACHE_SIZE = int(os.getenv("REVOKED_TOKEN_CACHE_SIZE", 100000))
+revoked_tokens = LRUCache(maxsize=REVOKED_CACHE_SIZE)
+
+# Revoked-cache states: rotated tokens still trigger reuse handling once if replayed
+ROTATED = "rotated"
+REJECTED = "rejected"
+
+# Expired refresh tokens are purged in batches of this size every interval
+TOKEN_SWEEP_INTERVAL = int(os.getenv("TOKEN_SWEEP_INTERVAL", 3600))
+TOKEN_SWEEP_BATCH_SIZE = int(os.getenv("TOKEN_SWEEP_BATCH_SIZE", 1000))
+
+
+def invalid_refresh_token():
+    return HTTPException(status_code=401, detail="Could not validate refresh token!")
+
+
+def remember_revoked(jti: str, state: str, exp: float = None):
+    """Cache a revoked jti until the token would have expired anyway."""
+    ttl = (exp - time.time()) if exp else REFRESH_TOKEN_EXPIRE_DAYS * 86400
+    if ttl > 0:
+        revoked_tokens.set(jti, state, ttl=ttl)
+
+
+async def issue_tokens(db: AsyncSession, email: str, role: str) -> dict:
+    """Create an access/refresh token pair and record the refresh token."""
+    jti = uuid.uuid4().hex
+    tokens = create_tokens(data={"sub": email, "role": role}, jti=jti)
+
+    db.add(RefreshToken(
+        jti=jti,
+        user_email=email,
+        expires_at=datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    await db.commit()
+    return {**tokens, "token_type": "bearer"}
+
+
+async def rotate_refresh_token(db: AsyncSession, refresh_token: str) -> dict:
+    """Exchange a refresh token for a new token pair, revoking the old one."""
+    payload = decode_token(refresh_token)
+    if payload is None:
+        raise invalid_refresh_token()
+
+    jti = payload.get("jti")
+    email = payload.get("sub")
+    if payload.get("type") != "refresh" or jti is None or email is None:
+        raise invalid_refresh_token()
+
+    # Replays of tokens already dealt with are rejected from memory
+    state = revoked_tokens.get(jti)
+    if state == REJECTED:
+        raise invalid_refresh_token()
+
+    if state is None:
+        # Check and revoke in one statement, so concurrent replays can't both succeed
+        now = datetime.utcnow()
+        result = await db.execute(
+            update(RefreshToken)
+            .where(RefreshToken.jti == jti, RefreshToken.revoked_at.is_(None), RefreshToken.expires_at > now)
+            .values(revoked_at=now)
+            .returning(RefreshToken.user_email)
+        )
+        if result.scalar_one_or_none() is not None:
+            remember_revoked(jti, ROTATED, payload.get("exp"))
+            # Issue the user's current role, read fresh rather than trusted from the old token
+            invalidate_user(email)
+            user = await get_user_by_email(db, email)
+            if user is None:
+                await db.commit()
+                raise invalid_refresh_token()
+            return await issue_tokens(db, user["email"], user["role"])
+        await db.rollback()
+
+    await revoke_on_reuse(db, jti)
+    remember_revoked(jti, REJECTED, payload.get("exp"))
+    raise invalid_refresh_token()
+
+
+async def revoke_on_reuse(db: AsyncSession, jti: str):
+    """If an already-rotated token is replayed, revoke every active token of its user."""
+    email = await db.scalar(
+        select(RefreshToken.user_email).where(RefreshToken.jti == jti, RefreshToken.revoked_at.is_not(None))
+    )
+    if email is None:
+        return
+
+    logger.warning("Refresh token reuse detected for %s; revoking all of their refresh tokens", email)
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.user_email == email, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+    )
+    await db.commit()
+
+
+async def revoke_refresh_token(db: AsyncSession, refresh_token: str):
+    """Revoke a single refresh token, e.g. on logout."""
+    payload = decode_token(refresh_token)
+    if payload is None:
+        raise invalid_refresh_token()
+
+    jti = payload.get("jti")
+    if payload.get("type") != "refresh" or jti is None:
+        raise invalid_refresh_token()
+
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.jti == jti, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+    )
+    await db.commit()
+    remember_revoked(jti, REJECTED, payload.get("exp"))
+
+
+async def purge_expired_tokens(batch_size: int = TOKEN_SWEEP_BATCH_SIZE) -> int:
+    """Delete expired refresh tokens in small batches, committing after each one."""
+    deleted = 0
+    async with AsyncSessionLocal() as db:
+        while True:
+            expired = (
+                select(RefreshToken.id)
+                .where(RefreshToken.expires_at < datetime.utcnow())
+                .limit(batch_size)
+                .scalar_subquery()
+            )
+            result = await db.execute(delete(RefreshToken).where(RefreshToken.id.in_(expired)))
+            await db.commit()
+
+            deleted += result.rowcount
+            if result.rowcount < batch_size:
+                return deleted
+            # Let other requests use the event loop and database between batches
+            await asyncio.sleep(0.1)
+
+
+async def run_token_sweeper(interval: int = TOKEN_SWEEP_INTERVAL):
+    """Background task purging expired refresh tokens until cancelled."""
+    while True:
+        try:
+            deleted = await purge_expired_tokens()
+            if deleted:
+                logger.info("Purged %d expired refresh tokens", deleted)
+        except Exception:
+            logger.exception("Refresh token sweep failed")
+        await asyncio.sleep(interval)
@@ -0,0 +1,46 @@
+from typing import Optional
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.cache import LRUCache
+from app.models import User
+import os
+
+# Read-through cache of email -> id/role for authorization and profile lookups
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", 10000))
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", 300))
+user_cache = LRUCache(maxsize=USER_CACHE_SIZE, ttl=USER_CACHE_TTL)
+
+
+def normalize_email(email: str) -> str:
+    return email.strip().lower()
+
+
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[dict]:
+    """Return {"id", "email", "role"} for a user, matching email case-insensitively.
+
+    Only existing users are cached, so a user created by another worker is never
+    hidden behind a stale miss; role changes made elsewhere show up within the TTL.
+    """
+    key = normalize_email(email)
+    user = user_cache.get(key)
+    if user is not None:
+        return user
+
+    # Served by the unique uq_users_email_lower functional index
+    generation = user_cache.generation
+    result = await db.execute(
+        select(User.id, User.email, User.role).where(func.lower(User.email) == key)
+    )
+    row = result.one_or_none()
+    if row is None:
+        return None
+
+    user = {"id": row.id, "email": row.email, "role": row.role}
+    if user_cache.generation == generation:
+        user_cache.set(key, user)
+    return user
+
+
+def invalidate_user(email: str):
+    """Drop a cached user after it has been created or changed."""
+    user_cache.delete(normalize_email(email))
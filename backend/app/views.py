@@ -0,0 +1,125 @@
+from sqlalchemy import bindparam, select
+from app.cache import LRUCache, SharedGeneration
+from app.database import AsyncSessionLocal, dialect_insert
+from app.models import Blog, BlogView
+from app.serialization import rows_to_dicts
+from contextlib import suppress
+import asyncio
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# Buffered view counts are written to the database this often, in one batched upsert
+VIEW_FLUSH_INTERVAL = float(os.getenv("VIEW_FLUSH_INTERVAL", 10))
+# Flush early once this many distinct blogs have pending views
+VIEW_BUFFER_MAX_KEYS = int(os.getenv("VIEW_BUFFER_MAX_KEYS", 10000))
+
+# Bumped on every blog write, so all forked workers drop their cached blog pages
+blog_generation = SharedGeneration()
+
+# Most-read blogs kept ready to serve; refreshed at most once per TTL
+POPULAR_SIZE = int(os.getenv("POPULAR_SIZE", 50))
+POPULAR_CACHE_TTL = float(os.getenv("POPULAR_CACHE_TTL", 60))
+popular_cache = LRUCache(maxsize=1, ttl=POPULAR_CACHE_TTL, shared_generation=blog_generation)
+
+
+class ViewCounter:
+    """Aggregates blog view increments in memory and writes them behind.
+
+    Recording a view is a dict update, so the read path never writes to the
+    database. Counts are lost only if the process dies without shutting down.
+    """
+
+    def __init__(self):
+        self.pending = {}
+        self._lock = asyncio.Lock()
+        self._early_flush = None
+
+    def record(self, blog_id: int):
+        self.pending[blog_id] = self.pending.get(blog_id, 0) + 1
+        if len(self.pending) >= VIEW_BUFFER_MAX_KEYS and (self._early_flush is None or self._early_flush.done()):
+            self._early_flush = asyncio.create_task(self.flush())
+            self._early_flush.add_done_callback(self._early_flush_done)
+
+    @staticmethod
+    def _early_flush_done(task: asyncio.Task):
+        # flush() has already put the counts back for the next attempt
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Early flush of blog view counts failed", exc_info=task.exception())
+
+    async def wait_for_early_flush(self):
+        """Wait for an in-flight early flush; its failures are logged by its callback."""
+        if self._early_flush is not None:
+            with suppress(Exception, asyncio.CancelledError):
+                await self._early_flush
+
+    async def flush(self) -> int:
+        """Add pending counts to blog_views in one executemany upsert; return blogs updated."""
+        async with self._lock:
+            if not self.pending:
+                return 0
+            counts, self.pending = self.pending, {}
+
+            try:
+                async with AsyncSessionLocal() as db:
+                    insert = dialect_insert(db)
+                    table = BlogView.__table__
+                    # Core insert (not ORM bulk), selecting through blogs so views of
+                    # since-deleted blogs are dropped instead of failing the foreign key
+                    statement = insert(table).from_select(
+                        ["blog_id", "views"],
+                        select(Blog.id, bindparam("views")).where(Blog.id == bindparam("blog_id")),
+                    )
+                    statement = statement.on_conflict_do_update(
+                        index_elements=[table.c.blog_id],
+                        set_={"views": table.c.views + statement.excluded.views},
+                    )
+                    await db.execute(
+                        statement,
+                        [{"blog_id": blog_id, "views": views} for blog_id, views in counts.items()],
+                    )
+                    await db.commit()
+            except BaseException:
+                # Keep the counts for the next attempt, also when cancelled mid-write
+                for blog_id, views in counts.items():
+                    self.pending[blog_id] = self.pending.get(blog_id, 0) + views
+                raise
+            return len(counts)
+
+
+view_counter = ViewCounter()
+
+
+async def run_view_flusher(interval: float = VIEW_FLUSH_INTERVAL):
+    """Background task flushing buffered views until cancelled, then one last time."""
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await view_counter.flush()
+            except Exception:
+                logger.exception("Flushing blog view counts failed")
+    finally:
+        await view_counter.wait_for_early_flush()
+        try:
+            await view_counter.flush()
+        except Exception:
+            logger.exception("Flushing blog view counts on shutdown failed")
+
+
+async def get_popular_blogs(db, limit: int) -> list:
+    """Return the most viewed blogs, from the cached top list when it is fresh."""
+    generation = popular_cache.generation
+    top = popular_cache.get("top")
+    if top is None:
+        result = await db.execute(
+            select(Blog.id, Blog.title, Blog.author, BlogView.views)
+            .join(BlogView, BlogView.blog_id == Blog.id)
+            .order_by(BlogView.views.desc(), Blog.id)
+            .limit(POPULAR_SIZE)
+        )
+        top = rows_to_dicts(result)
+        if popular_cache.generation == generation:
+            popular_cache.set("top", top)
+    return top[:limit]
@@ -0,0 +1,263 @@
+"""Load-test the API in-process and save latency/throughput results as JSON.
+
+Boots app.main:app against a throwaway database, seeds blogs and users, and
+drives each scenario with concurrent httpx clients over the ASGI transport.
+
+Usage (from backend/):
+    python -m benchmarks.api --blogs 10000 --users 1000 --requests 2000 --concurrency 32
+    python -m benchmarks.api --database-url postgresql://localhost/portfolio_bench
+    python -m benchmarks.compare results/old.json results/new.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+BENCH_PASSWORD = "benchmark-password"
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", help="Throwaway database to benchmark against; its tables are dropped and recreated (default: a temporary SQLite file)")
+    parser.add_argument("--blogs", type=int, default=5000, help="Blog rows to seed")
+    parser.add_argument("--users", type=int, default=500, help="User rows to seed")
+    parser.add_argument("--content-size", type=int, default=4000, help="Characters of content per blog")
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients per scenario")
+    parser.add_argument("--bcrypt-rounds", type=int, default=12, help="bcrypt cost used for seeded and verified passwords")
+    parser.add_argument("--scenarios", nargs="+", help="Only run these scenarios")
+    parser.add_argument("--output", help="Where to write the JSON results (default: benchmarks/results/)")
+    return parser.parse_args(argv)
+
+
+def configure_environment(args):
+    """Point the app at the benchmark database before it is imported."""
+    if not args.database_url:
+        path = os.path.join(tempfile.mkdtemp(prefix="portfolio-bench-"), "bench.db")
+        args.database_url = f"sqlite:///{path}"
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ["BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+    # Every benchmark request comes from one client, which the rate limiter would throttle
+    os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+
+def seed(args):
+    """Recreate the schema and bulk-insert blogs and users."""
+    from sqlalchemy import insert
+    from app.auth import hash_password
+    from app.database import Base, engine
+    from app.models import Blog, User
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    content = ("lorem ipsum dolor sit amet " * (args.content_size // 27 + 1))[:args.content_size]
+    # Every user shares one hash, so seeding doesn't spend minutes in bcrypt
+    password = hash_password(BENCH_PASSWORD)
+
+    with engine.begin() as conn:
+        for start in range(0, args.blogs, 1000):
+            conn.execute(insert(Blog), [
+                {"title": f"Benchmark post {i}", "content": content, "author": f"author{i % 50}@example.com"}
+                for i in range(start, min(start + 1000, args.blogs))
+            ])
+        for start in range(0, args.users, 1000):
+            conn.execute(insert(User), [
+                {"email": f"user{i}@example.com", "password": password, "role": "user"}
+                for i in range(start, min(start + 1000, args.users))
+            ])
+
+
+def build_scenarios(args):
+    """Return {name: request function}, each taking (client, request index)."""
+    from datetime import datetime, timedelta
+    from sqlalchemy import insert
+    from app.auth import create_tokens, REFRESH_TOKEN_EXPIRE_DAYS
+    from app.database import engine
+    from app.models import RefreshToken
+
+    users = [f"user{i}@example.com" for i in range(min(args.users, 100))]
+    tokens = [create_tokens({"sub": email, "role": "user"}, jti=f"bench-{i}") for i, email in enumerate(users)]
+
+    # Refresh tokens rotate, so each user's current one is tracked and used by one client at a time
+    with engine.begin() as conn:
+        conn.execute(insert(RefreshToken), [
+            {
+                "jti": f"bench-{i}",
+                "user_email": email,
+                "expires_at": datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS),
+            }
+            for i, email in enumerate(users)
+        ])
+    refresh_tokens = [pair["refresh_token"] for pair in tokens]
+    refresh_locks = [asyncio.Lock() for _ in users]
+    page = 20
+
+    async def blogs(client, i):
+        cursor = (i * page) % max(args.blogs, 1)
+        return await client.get("/blogs/", params={"cursor": cursor, "limit": page})
+
+    async def blogs_summary(client, i):
+        cursor = (i * page) % max(args.blogs, 1)
+        return await client.get("/blogs/", params={"cursor": cursor, "limit": page, "summary": "true"})
+
+    async def login(client, i):
+        email = users[i % len(users)]
+        return await client.post("/users/login", json={"email": email, "password": BENCH_PASSWORD})
+
+    async def refresh(client, i):
+        index = i % len(users)
+        async with refresh_locks[index]:
+            response = await client.post("/auth/refresh", json={"refresh_token": refresh_tokens[index]})
+            if response.status_code == 200:
+                refresh_tokens[index] = response.json()["refresh_token"]
+            return response
+
+    async def profile(client, i):
+        index = i % len(users)
+        headers = {"Authorization": f"Bearer {tokens[index]['access_token']}"}
+        return await client.get(f"/protected/profile/{users[index]}", headers=headers)
+
+    return {
+        "blogs": blogs,
+        "blogs_summary": blogs_summary,
+        "login": login,
+        "refresh": refresh,
+        "profile": profile,
+    }
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MiB.
+
+    The kernel only tracks a high-water mark for the whole process, so this
+    covers seeding and every scenario run before the call, not one scenario.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+async def run_scenario(app, request, total, concurrency):
+    """Issue `total` requests from `concurrency` clients and summarise the latencies."""
+    import httpx
+
+    latencies = []
+    statuses = {}
+    counter = iter(range(total))
+
+    async def worker(client):
+        for i in counter:
+            start = time.perf_counter()
+            response = await request(client, i)
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        duration = time.perf_counter() - started
+
+    latencies.sort()
+    ms = [value * 1000 for value in latencies]
+    return {
+        "requests": total,
+        "errors": sum(count for status, count in statuses.items() if status >= 400),
+        "status_codes": {str(status): count for status, count in sorted(statuses.items())},
+        "concurrency": concurrency,
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(total / duration, 1) if duration else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(ms, 0.50), 3),
+            "p95": round(percentile(ms, 0.95), 3),
+            "p99": round(percentile(ms, 0.99), 3),
+            "mean": round(sum(ms) / len(ms), 3) if ms else 0.0,
+            "max": round(ms[-1], 3) if ms else 0.0,
+        },
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args):
+    from app.main import app
+
+    scenarios = build_scenarios(args)
+    selected = args.scenarios or list(scenarios)
+    unknown = set(selected) - set(scenarios)
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    results = {}
+    # Run startup/shutdown hooks, which the ASGI transport does not do by itself
+    async with app.router.lifespan_context(app):
+        for name in selected:
+            results[name] = await run_scenario(app, scenarios[name], args.requests, args.concurrency)
+            latency = results[name]["latency_ms"]
+            print(
+                f"{name:<14} {results[name]['throughput_rps']:>9} req/s  "
+                f"p50 {latency['p50']:>8} ms  p95 {latency['p95']:>8} ms  p99 {latency['p99']:>8} ms  "
+                f"errors {results[name]['errors']}"
+            )
+    return results
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    configure_environment(args)
+    seed(args)
+
+    results = asyncio.run(run(args))
+
+    commit = git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": args.database_url.split("://", 1)[0],
+            "blogs": args.blogs,
+            "users": args.users,
+            "content_size": args.content_size,
+            "bcrypt_rounds": args.bcrypt_rounds,
+        },
+        "scenarios": results,
+        # Measured once for the whole run, see peak_rss_mb()
+        "run": {"peak_rss_mb": peak_rss_mb()},
+    }
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"{stamp}-{commit or 'unknown'}.json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Peak RSS {report['run']['peak_rss_mb']} MiB for the whole run, results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
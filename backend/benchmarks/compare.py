@@ -0,0 +1,78 @@
+"""Compare two benchmark result files and flag regressions.
+
+Usage (from backend/):
+    python -m benchmarks.compare results/baseline.json results/candidate.json --threshold 10
+"""
+import argparse
+import json
+import sys
+
+# Metrics where a larger value is worse
+LATENCY_KEYS = ("p50", "p95", "p99")
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def change(old, new):
+    """Percentage change from old to new."""
+    if not old:
+        return 0.0
+    return (new - old) / old * 100
+
+
+def compare(baseline, candidate, threshold):
+    """Print a comparison table and return the list of regressions."""
+    regressions = []
+    print(f"baseline  {baseline['meta'].get('commit')}  ->  candidate  {candidate['meta'].get('commit')}")
+    print(f"{'scenario':<14} {'metric':<14} {'baseline':>12} {'candidate':>12} {'change':>9}")
+
+    for name, new in candidate["scenarios"].items():
+        old = baseline["scenarios"].get(name)
+        if old is None:
+            print(f"{name:<14} (new scenario)")
+            continue
+
+        rows = [(f"latency {key}", old["latency_ms"][key], new["latency_ms"][key], True) for key in LATENCY_KEYS]
+        rows.append(("throughput", old["throughput_rps"], new["throughput_rps"], False))
+        regressions.extend(compare_rows(name, rows, threshold))
+
+    # Peak RSS is process-wide, so it is compared once for the whole run
+    old_run, new_run = baseline.get("run", {}), candidate.get("run", {})
+    if "peak_rss_mb" in old_run and "peak_rss_mb" in new_run:
+        rows = [("peak rss mb", old_run["peak_rss_mb"], new_run["peak_rss_mb"], True)]
+        regressions.extend(compare_rows("(whole run)", rows, threshold))
+
+    return regressions
+
+
+def compare_rows(name, rows, threshold):
+    """Print (metric, baseline, candidate, higher_is_worse) rows and return those that regressed."""
+    regressions = []
+    for metric, old_value, new_value, higher_is_worse in rows:
+        delta = change(old_value, new_value)
+        worse = delta > threshold if higher_is_worse else delta < -threshold
+        marker = "  <-- regression" if worse else ""
+        print(f"{name:<14} {metric:<14} {old_value:>12} {new_value:>12} {delta:>+8.1f}%{marker}")
+        if worse:
+            regressions.append((name, metric, delta))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Percent change counted as a regression")
+    args = parser.parse_args(argv)
+
+    regressions = compare(load(args.baseline), load(args.candidate), args.threshold)
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.threshold}%")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Measure cold-import time of the app and report the slowest imports.
+
+Each run imports the module in a fresh interpreter with -X importtime, so
+nothing is shared between runs except the OS file cache.
+
+Usage (from backend/):
+    python -m benchmarks.import_time --runs 10
+    python -m benchmarks.import_time --module app.routes.auth --top 30 --output results/import.json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main", help="Module to import")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to start")
+    parser.add_argument("--top", type=int, default=15, help="Slowest top-level packages to list")
+    parser.add_argument("--output", help="Also write the results as JSON to this path")
+    return parser.parse_args(argv)
+
+
+def import_once(module: str) -> list:
+    """Import module in a new interpreter and return (name, self_us, cumulative_us) rows."""
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", "sqlite://")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [BACKEND_DIR, env.get("PYTHONPATH")]))
+
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def summarize(runs: list, module: str, top: int) -> dict:
+    """Median total time plus the heaviest top-level packages across runs."""
+    totals = []
+    packages = {}
+    for rows in runs:
+        total = next((cumulative for name, _, cumulative in rows if name == module), 0)
+        totals.append(total / 1000)
+
+        # Self time summed per top-level package, so deep import chains are attributed once
+        per_package = {}
+        for name, self_us, _ in rows:
+            package = name.split(".")[0]
+            per_package[package] = per_package.get(package, 0) + self_us
+        for package, us in per_package.items():
+            packages.setdefault(package, []).append(us / 1000)
+
+    heaviest = sorted(
+        ((package, statistics.median(times)) for package, times in packages.items()),
+        key=lambda item: item[1],
+        reverse=True,
+    )[:top]
+
+    return {
+        "module": module,
+        "runs": len(runs),
+        "import_ms": {
+            "median": round(statistics.median(totals), 1),
+            "min": round(min(totals), 1),
+            "max": round(max(totals), 1),
+        },
+        "packages_ms": {package: round(ms, 1) for package, ms in heaviest},
+    }
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    runs = [import_once(args.module) for _ in range(args.runs)]
+    report = summarize(runs, args.module, args.top)
+
+    timing = report["import_ms"]
+    print(f"import {args.module}: median {timing['median']} ms (min {timing['min']}, max {timing['max']}) over {args.runs} runs")
+    print(f"{'package':<28} {'self ms':>9}")
+    for package, ms in report["packages_ms"].items():
+        print(f"{package:<28} {ms:>9.1f}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
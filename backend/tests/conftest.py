@@ -0,0 +1,23 @@
+import os
+import tempfile
+
+# Configure the app before it is imported: a throwaway SQLite database,
+# cheap password hashing and no rate limiting between test requests
+os.environ.setdefault(
+    "DATABASE_URL", "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="portfolio-tests-"), "test.db")
+)
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture(scope="session")
+def client():
+    from app.database import Base, engine
+    from app.main import app
+
+    Base.metadata.create_all(engine)
+    with TestClient(app) as client:
+        yield client
@@ -0,0 +1,126 @@
+import asyncio
+import types
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from app import ratelimit
+from app.ratelimit import InMemoryRateLimitBackend, RateLimitBackend
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    # Only the limiter sees the fake clock, not the event loop
+    monkeypatch.setattr(ratelimit, "time", types.SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+def hit(backend, key="k", rate=1.0, burst=2, cost=1.0):
+    return asyncio.run(backend.hit(key, rate, burst, cost))
+
+
+def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        RateLimitBackend()
+
+
+def test_bucket_refills_at_rate(clock):
+    backend = InMemoryRateLimitBackend()
+
+    assert hit(backend) == 0
+    assert hit(backend) == 0
+    assert hit(backend) == pytest.approx(1.0)
+
+    clock.advance(0.5)
+    assert hit(backend) == pytest.approx(0.5)
+
+    clock.advance(0.5)
+    assert hit(backend) == 0
+    assert hit(backend) == pytest.approx(1.0)
+
+    # Never refills beyond the burst size
+    clock.advance(60)
+    assert hit(backend) == 0
+    assert hit(backend) == 0
+    assert hit(backend) > 0
+
+
+def test_full_bucket_is_expired(clock):
+    backend = InMemoryRateLimitBackend(slots=8)
+    hit(backend, burst=2)
+    assert len(backend) == 1
+
+    clock.advance(0.9)
+    hit(backend, key="other")
+    assert "k" in backend.buckets
+
+    clock.advance(1.2)
+    hit(backend, key="other")
+    assert "k" not in backend.buckets
+
+
+def test_expiry_beyond_one_wheel_turn(clock):
+    backend = InMemoryRateLimitBackend(slots=4)
+    # Refilling 10 tokens at 1/s takes 10 ticks, more than the 4 slots of the wheel
+    assert hit(backend, rate=1.0, burst=10, cost=10) == 0
+
+    for _ in range(9):
+        clock.advance(1)
+        backend.expire(clock.now)
+        assert "k" in backend.buckets
+
+    clock.advance(1)
+    backend.expire(clock.now)
+    assert "k" not in backend.buckets
+
+
+def test_clock_jump_past_whole_wheel(clock):
+    backend = InMemoryRateLimitBackend(slots=4)
+    hit(backend, key="short", rate=1.0, burst=1)
+    hit(backend, key="long", rate=0.01, burst=1)
+
+    clock.advance(50)
+    backend.expire(clock.now)
+    assert set(backend.buckets) == {"long"}
+
+    clock.advance(60)
+    backend.expire(clock.now)
+    assert not backend.buckets
+
+
+def test_dependency_sets_retry_after(clock, monkeypatch):
+    monkeypatch.setattr(ratelimit, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(ratelimit, "RATE_LIMIT_IP_PER_MINUTE", 24)
+    monkeypatch.setattr(ratelimit, "RATE_LIMIT_IP_BURST", 1)
+    monkeypatch.setattr(ratelimit, "rate_limit_backend", InMemoryRateLimitBackend())
+
+    app = FastAPI()
+
+    @app.get("/", dependencies=[Depends(ratelimit.rate_limit("test"))])
+    def index():
+        return {}
+
+    client = TestClient(app)
+    assert client.get("/").status_code == 200
+
+    response = client.get("/")
+    assert response.status_code == 429
+    # 24 per minute is one token every 2.5s, rounded up
+    assert response.headers["Retry-After"] == "3"
+
+    clock.advance(1)
+    assert client.get("/").headers["Retry-After"] == "2"
+
+    clock.advance(1.5)
+    assert client.get("/").status_code == 200
@@ -0,0 +1,51 @@
+import asyncio
+from collections import deque
+from app.stats import DashboardStats
+
+
+class RecountingStats(DashboardStats):
+    """Stats whose recount returns canned results, running a write in the middle of each."""
+
+    def __init__(self, recounts: list, writes: list):
+        super().__init__()
+        self.recounts = recounts
+        self.writes = writes
+        self.calls = 0
+
+    async def _recount(self) -> tuple:
+        users, blogs = self.recounts[self.calls]
+        write = self.writes[self.calls] if self.calls < len(self.writes) else None
+        self.calls += 1
+        if write is not None:
+            write(self)
+        await asyncio.sleep(0)
+        return dict(users), dict(blogs), deque(maxlen=10)
+
+
+def test_recount_is_retried_after_a_concurrent_write():
+    stats = RecountingStats(
+        recounts=[({"user": 1}, {"ann": 1}), ({"user": 2}, {"ann": 2})],
+        writes=[lambda s: s.blogs_created(["ann"])],
+    )
+    asyncio.run(stats.reconcile())
+
+    assert stats.calls == 2
+    assert stats.snapshot()["users_by_role"] == {"user": 2}
+    assert stats.blogs_by_author == {"ann": 2}
+
+
+def test_last_attempt_keeps_concurrent_writes():
+    stats = RecountingStats(
+        recounts=[({"user": 1}, {"ann": 1})] * 2,
+        writes=[
+            lambda s: s.user_created(7, "new@example.com", "user"),
+            lambda s: (s.blogs_created(["bob"]), s.blogs_deleted(["ann"])),
+        ],
+    )
+    asyncio.run(stats.reconcile(attempts=2))
+
+    assert stats.calls == 2
+    # Only the last attempt's writes are replayed onto its recount
+    assert stats.users_by_role == {"user": 1}
+    assert stats.blogs_by_author == {"bob": 1}
+    assert stats.snapshot()["total_authors"] == 1
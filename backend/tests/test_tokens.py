@@ -0,0 +1,77 @@
+import uuid
+import pytest
+from sqlalchemy import delete, update
+from app.database import engine
+from app.models import User
+
+
+@pytest.fixture
+def email():
+    return f"user-{uuid.uuid4().hex[:8]}@example.com"
+
+
+def login(client, email: str, password: str = "secret") -> dict:
+    response = client.post("/users/login", json={"email": email, "password": password})
+    assert response.status_code == 200
+    return response.json()
+
+
+def register(client, email: str, role: str = "user") -> dict:
+    assert client.post("/users/register", json={"email": email, "password": "secret"}).status_code == 200
+    if role != "user":
+        with engine.begin() as conn:
+            conn.execute(update(User).where(User.email == email).values(role=role))
+    return login(client, email)
+
+
+def refresh(client, refresh_token: str):
+    return client.post("/auth/refresh", json={"refresh_token": refresh_token})
+
+
+def dashboard(client, access_token: str):
+    return client.get("/protected/dashboard", headers={"Authorization": f"Bearer {access_token}"})
+
+
+def test_refresh_rotates_token(client, email):
+    tokens = register(client, email)
+
+    response = refresh(client, tokens["refresh_token"])
+    assert response.status_code == 200
+    rotated = response.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+
+    assert refresh(client, rotated["refresh_token"]).status_code == 200
+
+
+def test_reused_refresh_token_revokes_all_tokens_of_user(client, email):
+    first = register(client, email)
+    other_session = login(client, email)
+    second = refresh(client, first["refresh_token"]).json()
+
+    # Replaying the rotated token looks like theft: every token of the user stops working
+    assert refresh(client, first["refresh_token"]).status_code == 401
+    assert refresh(client, second["refresh_token"]).status_code == 401
+    assert refresh(client, other_session["refresh_token"]).status_code == 401
+
+
+def test_refresh_issues_current_role(client, email):
+    tokens = register(client, email, role="admin")
+    assert dashboard(client, tokens["access_token"]).status_code == 200
+
+    with engine.begin() as conn:
+        conn.execute(update(User).where(User.email == email).values(role="user"))
+
+    response = refresh(client, tokens["refresh_token"])
+    assert response.status_code == 200
+    assert dashboard(client, response.json()["access_token"]).status_code == 403
+
+
+def test_refresh_rejected_for_deleted_user(client, email):
+    tokens = register(client, email, role="admin")
+
+    with engine.begin() as conn:
+        conn.execute(delete(User).where(User.email == email))
+
+    assert refresh(client, tokens["refresh_token"]).status_code == 401
+    # The token was consumed, so it stays rejected
+    assert refresh(client, tokens["refresh_token"]).status_code == 401